@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+""" Compares the streaming asciiencoding distill/compare with the originals """
+
+import argparse
+import timeit
+from itsybitser import asciiencoding, hextream
+import corpus
+import legacy
+
+COMMENT_INTERVAL = 16
+
+
+def main():
+    """ Program entry point """
+
+    parser = argparse.ArgumentParser(
+        description="Compares the streaming asciiencoding distill/compare with the originals"
+    )
+    parser.add_argument("-s", "--size", type=int, default=1048576,
+                        help="Size in bytes of the binary content behind each commented "
+                        "Hextream sample, which is about 3 characters per byte "
+                        "(default is 1048576)")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="Number of timed runs, best is reported (default is 3)")
+    args = parser.parse_args()
+
+    content = commented_hextream(corpus.mixed_asset(args.size))
+    first_line_end = content.index("\n") + 1
+    cases = [
+        ("identical", content),
+        ("differs at start", content[:first_line_end] + "X" + content[first_line_end + 1:]),
+        ("differs at end", content[:-2] + "X\n")
+    ]
+
+    print("{} characters per sample".format(len(content)))
+    print("{:<24} {:>11} {:>11} {:>8}".format("case", "original s", "current s", "speedup"))
+    report("distill", args.repeat,
+           lambda: legacy.asciiencoding_distill(content),
+           lambda: asciiencoding.distill(content))
+    for name, other in cases:
+        if asciiencoding.compare(content, other) != legacy.asciiencoding_compare(content, other):
+            raise AssertionError("{}: comparisons disagree".format(name))
+        report("compare " + name, args.repeat,
+               lambda other=other: legacy.asciiencoding_compare(content, other),
+               lambda other=other: asciiencoding.compare(content, other))
+
+def commented_hextream(binary_content):
+    """ Hextream text with a comment every COMMENT_INTERVAL lines """
+    lines = hextream.encode(binary_content).split("\n")
+    result = []
+    for index in range(0, len(lines), COMMENT_INTERVAL):
+        result.append("# Offset {:06X}".format(index * hextream.WRAP_BYTES_PER_LINE))
+        result.extend(lines[index:index + COMMENT_INTERVAL])
+    return "\n".join(result) + "\n"
+
+def report(name, repeat, original, current):
+    """ Times the original and current implementations of an operation """
+    original_seconds = min(timeit.repeat(original, number=1, repeat=repeat))
+    current_seconds = min(timeit.repeat(current, number=1, repeat=repeat))
+    print("{:<24} {:>11.4f} {:>11.4f} {:>7.1f}x".format(
+        name, original_seconds, current_seconds, original_seconds / current_seconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+""" Synthetic sample data for the benchmarks
+
+The generators produce content resembling the kinds of assets packed with
+ItsyBitser (maps, character sets, text tables, mostly-empty memory
+images, etc.), and are seeded so every run measures the same bytes. """
+
+import random
+
+SEED = 6502
+
+
+def mixed_asset(length, seed=SEED):
+    """ Mixture of runs, small-value streams and arbitrary bytes """
+    generator = random.Random(seed)
+    result = bytearray()
+    while len(result) < length:
+        kind = generator.randrange(5)
+        span = generator.randint(1, 64)
+        if kind == 0:
+            result.extend([generator.randrange(256)] * span)
+        elif kind == 1:
+            result.extend([generator.randrange(8) for _ in range(span)])
+        elif kind == 2:
+            result.extend([generator.randrange(64) for _ in range(span)])
+        elif kind == 3:
+            result.extend(bytes(span))
+        else:
+            result.extend([generator.randrange(256) for _ in range(span)])
+    return bytes(result[:length])
+
+def map_rows(length, seed=SEED):
+    """ Tile map made of a few distinct repeating rows of 40 cells """
+    generator = random.Random(seed)
+    tiles = [generator.randrange(0x10, 0x60) for _ in range(6)]
+    rows = [
+        bytes([generator.choice(tiles) for _ in range(40)])
+        for _ in range(8)
+    ]
+    result = bytearray()
+    while len(result) < length:
+        result.extend(generator.choice(rows))
+    return bytes(result[:length])
+
+def character_set(length, seed=SEED):
+    """ 8x8 glyph bitmaps, with some duplicated glyphs """
+    generator = random.Random(seed)
+    glyphs = [
+        bytes([generator.randrange(256) for _ in range(8)])
+        for _ in range(48)
+    ]
+    result = bytearray()
+    while len(result) < length:
+        if generator.randrange(3):
+            result.extend(generator.choice(glyphs))
+        else:
+            result.extend([generator.randrange(256) for _ in range(8)])
+    return bytes(result[:length])
+
+def text_table(length, seed=SEED):
+    """ Game text messages, with the skewed byte frequencies of English """
+    generator = random.Random(seed)
+    words = [
+        "THE", "OF", "AND", "TO", "A", "IN", "YOU", "LEVEL", "SCORE", "PLAYER",
+        "GAME", "OVER", "PRESS", "START", "BONUS", "KEY", "DOOR", "IS", "LOCKED"
+    ]
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    result = bytearray()
+    while len(result) < length:
+        message = generator.choices(words, weights, k=generator.randint(2, 8))
+        result.extend(" ".join(message).encode("ascii") + b"\x9b")
+    return bytes(result[:length])
+
+def memory_image(length, seed=SEED):
+    """ Mostly-empty memory, with scattered tables and code between zeros """
+    generator = random.Random(seed)
+    result = bytearray()
+    while len(result) < length:
+        result.extend(bytes(generator.randint(1, 400)))
+        if generator.randrange(2):
+            result.extend([generator.randrange(8) for _ in range(generator.randint(1, 48))])
+        else:
+            result.extend([generator.randrange(256) for _ in range(generator.randint(1, 48))])
+    return bytes(result[:length])
+
+def random_bytes(length, seed=SEED):
+    """ Incompressible content """
+    generator = random.Random(seed)
+    return bytes([generator.randrange(256) for _ in range(length)])
+
+CORPORA = {
+    "mixed": mixed_asset,
+    "map": map_rows,
+    "charset": character_set,
+    "text": text_table,
+    "memory": memory_image,
+    "random": random_bytes
+}
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+""" Compares the fbminify statement scanner with the original scanner """
+
+import argparse
+import importlib.util
+import os
+import random
+import timeit
+import corpus
+import legacy_fbminify
+
+FBMINIFY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin", "fbminify.py")
+STATEMENTS = [
+    "PRINT \"SCORE: \"; SCORE",
+    "POSITION X, Y : ? \"$1B$1C\"",
+    "IF X > 10 AND Y < 20 OR FLAG THEN X = 0",
+    "FOR I = 0 TO 255 STEP 2",
+    "NEXT I",
+    "POKE 712, PEEK(20) AND 15",
+    "DPOKE ADR(BUF) + I * 2, TABLE(I)",
+    "EXEC DRAW_SCREEN",
+    "PROC DRAW_SCREEN",
+    "ENDPROC",
+    "WHILE KEY <> 28 : KEY = GET(0) : WEND",
+    "SOUND 0, 100, 10, 8",
+]
+
+
+def main():
+    """ Program entry point """
+
+    parser = argparse.ArgumentParser(
+        description="Compares the fbminify statement scanner with the original scanner"
+    )
+    parser.add_argument("sourcefiles", nargs="*",
+                        type=argparse.FileType("r", encoding=legacy_fbminify.ENCODING),
+                        help="FastBasic source files to use as samples "
+                        "(default is a synthetic program)")
+    parser.add_argument("-l", "--lines", type=int, default=10000,
+                        help="Lines in the synthetic program (default is 10000)")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="Number of timed runs, best is reported (default is 3)")
+    args = parser.parse_args()
+
+    spec = importlib.util.spec_from_file_location("fbminify", FBMINIFY_PATH)
+    fbminify = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(fbminify)
+
+    if args.sourcefiles:
+        samples = [(sourcefile.name, sourcefile.read()) for sourcefile in args.sourcefiles]
+    else:
+        samples = [("program", synthetic_program(args.lines))]
+
+    print("{:<24} {:>10} {:>11} {:>11} {:>8}".format(
+        "sample", "characters", "original s", "current s", "speedup"))
+    for name, source in samples:
+        if fbminify.scan_for_statements(source) != legacy_fbminify.scan_for_statements(source):
+            raise AssertionError("{}: scanners disagree".format(name))
+        original_seconds = min(timeit.repeat(
+            lambda source=source: legacy_fbminify.scan_for_statements(source),
+            number=1, repeat=args.repeat
+        ))
+        current_seconds = min(timeit.repeat(
+            lambda source=source: fbminify.scan_for_statements(source),
+            number=1, repeat=args.repeat
+        ))
+        print("{:<24} {:>10} {:>11.4f} {:>11.4f} {:>7.1f}x".format(
+            name, len(source), original_seconds, current_seconds,
+            original_seconds / current_seconds))
+
+def synthetic_program(line_count):
+    """ FastBasic source of line_count lines, with indentation and comments """
+    generator = random.Random(corpus.SEED)
+    lines = []
+    for _ in range(line_count):
+        indent = "  " * generator.randrange(4)
+        choice = generator.random()
+        if choice < 0.2:
+            lines.append(indent + "' " + "Comment text, ignored by the scanner " * 2)
+        elif choice < 0.3:
+            lines.append("")
+        else:
+            line = indent + generator.choice(STATEMENTS)
+            if generator.random() < 0.2:
+                line += "  ' trailing comment"
+            lines.append(line)
+    return "\n".join(lines) + "\n"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+""" Compares the bit-packed GlyphSet with the original GlyphSet on a large atlas """
+
+import argparse
+import io
+import random
+import timeit
+import png
+from itsybitser import glyphset
+import corpus
+import legacy_glyphset
+
+
+def main():
+    """ Program entry point """
+
+    parser = argparse.ArgumentParser(
+        description="Compares the bit-packed GlyphSet with the original GlyphSet on a large atlas"
+    )
+    parser.add_argument("pngfiles", nargs="*", type=argparse.FileType("rb"),
+                        help="PNG atlas files to use as samples (default is a synthetic atlas)")
+    parser.add_argument("-g", "--glyph-columns", type=int, default=64,
+                        help="Glyphs per row and column of the synthetic atlas "
+                        "(default is 64, i.e. 4096 glyphs)")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="Number of timed runs, best is reported (default is 3)")
+    args = parser.parse_args()
+
+    if args.pngfiles:
+        samples = [(pngfile.name, pngfile.read()) for pngfile in args.pngfiles]
+    else:
+        samples = [("atlas", synthetic_atlas(args.glyph_columns))]
+
+    backends = [("python", None)]
+    if glyphset.numpy is not None:
+        backends.append(("numpy", glyphset.numpy))
+
+    print("{:<24} {:<8} {:>8} {:>11} {:>11} {:>8}".format(
+        "sample", "backend", "glyphs", "original s", "current s", "speedup"))
+    for name, content in samples:
+        expected = legacy_glyphset.GlyphSet(io.BytesIO(content)).render_glyphs()
+        original_seconds = min(timeit.repeat(
+            lambda content=content: legacy_glyphset.GlyphSet(io.BytesIO(content)).render_glyphs(),
+            number=1, repeat=args.repeat
+        ))
+        for backend, numpy_module in backends:
+            glyphset.numpy = numpy_module
+            current = glyphset.GlyphSet(io.BytesIO(content))
+            if current.render_glyphs() != expected:
+                raise AssertionError("{}: {} rendering differs".format(name, backend))
+            current_seconds = min(timeit.repeat(
+                lambda content=content: glyphset.GlyphSet(io.BytesIO(content)).render_glyphs(),
+                number=1, repeat=args.repeat
+            ))
+            print("{:<24} {:<8} {:>8} {:>11.4f} {:>11.4f} {:>7.1f}x".format(
+                name, backend, current.rows * current.columns, original_seconds,
+                current_seconds, original_seconds / current_seconds))
+
+def synthetic_atlas(glyph_columns):
+    """ PNG atlas of glyph_columns x glyph_columns glyphs, in assorted colors """
+    generator = random.Random(corpus.SEED)
+    width = glyph_columns * glyphset.GLYPH_WIDTH
+    rows = []
+    for _ in range(glyph_columns * glyphset.GLYPH_HEIGHT):
+        row = bytearray()
+        for _ in range(width):
+            if generator.random() < 0.5:
+                row.extend([generator.randrange(22) for _ in range(3)])
+            else:
+                row.extend([generator.randrange(256) for _ in range(3)])
+        rows.append(row)
+    output = io.BytesIO()
+    png.Writer(width, len(rows), greyscale=False).write(output, rows)
+    return output.getvalue()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+""" Compares the throughput of the hextream codec with the original codec """
+
+import argparse
+import timeit
+from itsybitser import hextream
+import corpus
+import legacy
+
+MEGABYTE = 1000000
+
+
+def main():
+    """ Program entry point """
+
+    parser = argparse.ArgumentParser(
+        description="Compares the throughput of the hextream codec with the original codec"
+    )
+    parser.add_argument("binfiles", nargs="*", type=argparse.FileType("rb"),
+                        help="Binary files to use as samples (default is synthetic corpora)")
+    parser.add_argument("-s", "--size", type=int, default=4194304,
+                        help="Size in bytes of each synthetic sample (default is 4194304)")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="Number of timed runs, best is reported (default is 3)")
+    args = parser.parse_args()
+
+    if args.binfiles:
+        samples = [(binfile.name, binfile.read()) for binfile in args.binfiles]
+    else:
+        samples = [(name, generate(args.size)) for name, generate in corpus.CORPORA.items()]
+
+    print("{:<24} {:<8} {:>10} {:>14} {:>14} {:>8}".format(
+        "sample", "codec", "bytes", "original MB/s", "current MB/s", "speedup"))
+    for name, content in samples:
+        encoded = hextream.encode(content)
+        if encoded != legacy.hextream_encode(content):
+            raise AssertionError("{}: encoders disagree".format(name))
+        if hextream.decode(encoded) != content:
+            raise AssertionError("{}: decoder does not round-trip".format(name))
+        report(name, "encode", len(content), args.repeat,
+               lambda content=content: legacy.hextream_encode(content),
+               lambda content=content: hextream.encode(content))
+        report(name, "decode", len(content), args.repeat,
+               lambda encoded=encoded: legacy.hextream_decode(encoded),
+               lambda encoded=encoded: hextream.decode(encoded))
+
+def report(name, codec, length, repeat, original, current):
+    """ Times the original and current implementations of a codec """
+    original_seconds = min(timeit.repeat(original, number=1, repeat=repeat))
+    current_seconds = min(timeit.repeat(current, number=1, repeat=repeat))
+    print("{:<24} {:<8} {:>10} {:>14.1f} {:>14.1f} {:>7.1f}x".format(
+        name, codec, length, length / MEGABYTE / original_seconds,
+        length / MEGABYTE / current_seconds, original_seconds / current_seconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+""" Baseline implementations, kept as reference points for the benchmarks
+
+These are the original (pre-optimization) versions of library functions,
+copied verbatim apart from their names, so that benchmarks can report
+the improvement over them and confirm identical results. """
+
+import re
+import textwrap
+from itsybitser.varipacker import (
+    Encoding, OFFSET, RADIX, HIGH_BITS_MASK, SEXTET_MASK, HIGH_TRIAD_MASK,
+    LOW_TRIAD_MASK, LOW_DYAD_MASK, LINEAR64_GROUP_LENGTH, MAX_CHUNK_LENGTH
+)
+from itsybitser.hextream import WRAP_BYTES_PER_LINE
+
+
+def varipacker_decode(content):
+    """ Decode binary data from VariPacker content (ASCII) """
+
+    encoding_properties = {
+        #             (encoding, cycle length, is run encoding)
+        Encoding.GAP: (Encoding.GAP, 1, False),
+        Encoding.HEADER: (Encoding.HEADER, 2, False),
+        Encoding.LINEAR64: (Encoding.LINEAR64, 4, False),
+        Encoding.OCTET_RUN: (Encoding.OCTET_RUN, 2, True),
+        Encoding.SEXTET_RUN: (Encoding.SEXTET_RUN, 1, True),
+        Encoding.SEXTET_STREAM: (Encoding.SEXTET_STREAM, 1, False),
+        Encoding.TRIAD_STREAM: (Encoding.TRIAD_STREAM, 1, False)
+    }
+
+    result = bytearray()
+    encoding, cycle_length, is_run_encoding = encoding_properties[Encoding.HEADER]
+    cycle_count = 0
+
+    for char in content:
+        sextet = ord(char) - OFFSET
+        if cycle_length > 1 and cycle_count == 0:
+            holding_sextet = sextet
+        else:
+            if encoding == Encoding.HEADER:
+                encoding, cycle_length, is_run_encoding = encoding_properties[
+                    Encoding(holding_sextet & LOW_TRIAD_MASK)
+                ]
+                remaining_bytes = ((holding_sextet & HIGH_TRIAD_MASK) << 3) + sextet
+                holding_sextet = 0
+                cycle_count = -1
+                if encoding == Encoding.GAP:
+                    result.extend([0] * remaining_bytes)
+                    encoding, cycle_length, is_run_encoding = encoding_properties[Encoding.HEADER]
+            else:
+                if is_run_encoding:   # SEXTET_RUN or OCTET_RUN
+                    result.extend([(holding_sextet << 6) + sextet] * remaining_bytes)
+                    remaining_bytes = 1
+                elif encoding == Encoding.TRIAD_STREAM:
+                    result.append(sextet & LOW_TRIAD_MASK)
+                    if remaining_bytes > 1:
+                        result.append((sextet & HIGH_TRIAD_MASK) >> 3)
+                        remaining_bytes -= 1
+                else:   # SEXTET_STREAM or LINEAR64
+                    result.append(((holding_sextet & LOW_DYAD_MASK) << 6) + sextet)
+                    holding_sextet = holding_sextet >> 2
+                remaining_bytes -= 1
+                if not remaining_bytes:
+                    encoding, cycle_length, is_run_encoding = encoding_properties[Encoding.HEADER]
+                    cycle_count = -1
+        cycle_count = (cycle_count + 1) % cycle_length
+    return bytes(result)
+
+def varipacker_encode(content):
+    """ Encode binary content in VariPacker format (ASCII) """
+
+    encoded_chunks = {}
+    source_buffer = [byte for byte in content]
+    source_buffer.append(None)   # Tail sentinel
+    all_triads = content and max(content) <= LOW_TRIAD_MASK
+
+    for encoding in (
+            Encoding.SEXTET_RUN, Encoding.OCTET_RUN, Encoding.TRIAD_STREAM,
+            Encoding.SEXTET_STREAM, Encoding.LINEAR64
+        ):
+
+        value_limit, min_viable_length, is_run_encoding = {
+            Encoding.LINEAR64: (0xff, 1, False),
+            Encoding.OCTET_RUN: (0xff, 13 if all_triads else 7, True),
+            Encoding.SEXTET_RUN: (0x3f, 11 if all_triads else 6, True),
+            Encoding.SEXTET_STREAM: (0x3f, 14, False),
+            Encoding.TRIAD_STREAM: (0x07, 1 if all_triads else 6, False)
+        }[encoding]
+
+        source_chunk = []
+        start_index = 0
+        chunk_finished = False
+
+        for index, byte in enumerate(source_buffer):
+            if byte is None or byte > value_limit:
+                chunk_finished = True
+            elif is_run_encoding and source_chunk and byte != source_chunk[-1]:
+                # If this is different from the last byte then the run is done
+                chunk_finished = True
+            else:
+                source_chunk.append(byte)
+                chunk_finished = len(source_chunk) >= MAX_CHUNK_LENGTH
+            if chunk_finished:
+                chunk_length = len(source_chunk)
+                if chunk_length >= min_viable_length:
+                    source_chunk = b"".join([bytes([byte]) for byte in source_chunk])
+                    encoded_chunks[start_index] = _encode_chunk(source_chunk, encoding)
+                    # Fill region of the chunk in the buffer with Nones, so it
+                    # doesn't get encoded on the next pass
+                    source_buffer[start_index:start_index + chunk_length] = [None] * chunk_length
+                start_index = index + 1
+                source_chunk = []
+                chunk_finished = False
+    result = "".join([chunk for (_, chunk) in sorted(encoded_chunks.items())])
+    return result
+
+def _encode_chunk(content, encoding):
+    """ Encodes a byte sequence using specified encoding  """
+    result = {
+        Encoding.LINEAR64: _encode_linear64,
+        Encoding.OCTET_RUN: _encode_octet_run,
+        Encoding.SEXTET_RUN: _encode_sextet_run,
+        Encoding.SEXTET_STREAM: _encode_sextet_stream,
+        Encoding.TRIAD_STREAM: _encode_triad_stream
+    }[encoding](content)
+    return _encode_header(encoding, len(content)) + result
+
+def _encode_linear64(content):
+    result = []
+    for content_index, byte in enumerate(content):
+        group_position = content_index % LINEAR64_GROUP_LENGTH
+        if not group_position:
+            high_bits_index = len(result)
+            result.append(0)
+        high_bits_shift = 2 * (LINEAR64_GROUP_LENGTH - group_position)
+        result[high_bits_index] += (byte & HIGH_BITS_MASK) >> high_bits_shift
+        result.append(byte & SEXTET_MASK)
+    return "".join([chr(byte + OFFSET) for byte in result])
+
+def _encode_header(encoding, length):
+    #print ("# Encoding={};Length={}".format(encoding.name, length))
+    result = (
+        chr(encoding.value + length // RADIX * 8 + OFFSET) +
+        chr((length & SEXTET_MASK) + OFFSET)
+    )
+    return result
+
+def _encode_octet_run(content):
+    if content:
+        result = (
+            chr(content[0] // RADIX + OFFSET) +
+            chr((content[0] & SEXTET_MASK) + OFFSET)
+        )
+    else:
+        result = ""
+    return result
+
+def _encode_sextet_run(content):
+    if content:
+        result = chr(content[0] + OFFSET)
+    else:
+        result = ""
+    return result
+
+def _encode_sextet_stream(content):
+    return "".join([chr(byte + OFFSET) for byte in content])
+
+def _encode_triad_stream(content):
+    result = []
+    for index in range(0, len(content), 2):
+        byte = content[index]
+        try:
+            byte += content[index + 1] << 3
+        except IndexError:
+            pass
+        result.append(chr(byte + OFFSET))
+    return "".join(result)
+
+
+def asciiencoding_compare(content1, content2):
+    """ Compares two strings """
+
+    result = -1
+    distilled_content1 = asciiencoding_distill(content1)
+    distilled_content2 = asciiencoding_distill(content2)
+    if distilled_content1 != distilled_content2:
+        result = 0
+        while distilled_content1[result] == distilled_content2[result]:
+            result += 1
+    return result
+
+def asciiencoding_distill(content):
+    """ Removes whitespace and comments from string """
+
+    # Eliminate comments
+    result = re.sub("#.*$", "", content, flags=re.MULTILINE)
+    # Eliminate all whitespace (split by default splits on any WS char)
+    result = ''.join(result.split())
+    return result
+
+def hextream_decode(content):
+    """ Decode binary data from ASCII hexadecimal characters """
+    return bytes.fromhex(hextream_distill(content))
+
+def hextream_distill(content):
+    """ Strip out comments, whitespace, and hex string prefix characters """
+    result = asciiencoding_distill(content.upper())
+    filter_prefix_characters = str.maketrans("", "", "\\xX$")
+    result = result.replace("0X", "").translate(filter_prefix_characters)
+    return result
+
+def hextream_encode(content):
+    """ Encode binary data as ASCII hexadecimal characters """
+    result = " ".join([format(byte, "02X") for byte in content])
+    # Break into lines of no more than 16 byte representations
+    result = "\n".join(textwrap.wrap(result, width=(WRAP_BYTES_PER_LINE * 3 - 1)))
+    return result
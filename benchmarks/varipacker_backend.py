@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+""" Compares the greedy planner backends (pure Python and NumPy) """
+
+import argparse
+import timeit
+from itsybitser import segmenter, varipacker
+import corpus
+import legacy
+
+
+def size_list(arg):
+    """ Parses a comma-separated list of sample sizes """
+    try:
+        sizes = [int(size) for size in arg.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid size list: {!r}".format(arg)) from None
+    if min(sizes) < 1:
+        raise argparse.ArgumentTypeError("sizes must be at least 1: {!r}".format(arg))
+    return sizes
+
+def main():
+    """ Program entry point """
+
+    parser = argparse.ArgumentParser(
+        description="Compares the greedy planner backends (pure Python and NumPy)"
+    )
+    parser.add_argument("-s", "--sizes", type=size_list,
+                        default=[1024, 65536, 16777216],
+                        help="Comma-separated sample sizes in bytes (default is 1K, 64K and 16M)")
+    parser.add_argument("-c", "--corpus", choices=sorted(corpus.CORPORA), default="mixed",
+                        help="Synthetic corpus to sample (default is mixed)")
+    parser.add_argument("-r", "--repeat", type=int, default=1,
+                        help="Number of timed runs, best is reported (default is 1)")
+    args = parser.parse_args()
+
+    encoders = [("original", legacy.varipacker_encode)]
+    for backend in segmenter.BACKENDS:
+        if backend == "numpy" and segmenter.numpy is None:
+            print("# NumPy is not installed, skipping numpy backend")
+            continue
+        encoders.append((
+            backend,
+            lambda content, backend=backend: varipacker.encode(content, backend=backend)
+        ))
+
+    print("{:>10} {:<10} {:>10} {:>9} {:>8}".format(
+        "bytes", "encoder", "chars", "seconds", "MB/s"))
+    for size in args.sizes:
+        content = corpus.CORPORA[args.corpus](size)
+        expected = None
+        for name, encoder in encoders:
+            encoded = encoder(content)
+            if expected is None:
+                expected = encoded
+            elif encoded != expected:
+                raise AssertionError("{}: output differs from original".format(name))
+            seconds = min(timeit.repeat(
+                lambda encoder=encoder: encoder(content), number=1, repeat=args.repeat
+            ))
+            print("{:>10} {:<10} {:>10} {:>9.4f} {:>8.2f}".format(
+                size, name, len(encoded), seconds, size / seconds / 1e6))
+
+if __name__ == "__main__":
+    main()
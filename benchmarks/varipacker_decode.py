@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+""" Compares the table-driven varipacker decoder with the original decoder """
+
+import argparse
+import timeit
+from itsybitser import varipacker
+import corpus
+import legacy
+
+
+def main():
+    """ Program entry point """
+
+    parser = argparse.ArgumentParser(
+        description="Compares the table-driven varipacker decoder with the original decoder"
+    )
+    parser.add_argument("varpfiles", nargs="*", type=argparse.FileType("r", encoding="UTF-8"),
+                        help="Varipacker files to use as samples (default is synthetic corpora)")
+    parser.add_argument("-s", "--size", type=int, default=1048576,
+                        help="Size in bytes of each synthetic sample (default is 1048576)")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="Number of timed runs, best is reported (default is 3)")
+    args = parser.parse_args()
+
+    if args.varpfiles:
+        samples = [
+            (varpfile.name, varipacker.distill(varpfile.read())) for varpfile in args.varpfiles
+        ]
+    else:
+        samples = [
+            (name, varipacker.encode(generate(args.size)))
+            for name, generate in corpus.CORPORA.items()
+        ]
+
+    print("{:<24} {:>10} {:>10} {:>11} {:>11} {:>8}".format(
+        "sample", "chars", "bytes", "original s", "table s", "speedup"))
+    for name, content in samples:
+        decoded = varipacker.decode(content)
+        if decoded != legacy.varipacker_decode(content):
+            raise AssertionError("{}: decoders disagree".format(name))
+        original_seconds = min(timeit.repeat(
+            lambda content=content: legacy.varipacker_decode(content), number=1, repeat=args.repeat
+        ))
+        table_seconds = min(timeit.repeat(
+            lambda content=content: varipacker.decode(content), number=1, repeat=args.repeat
+        ))
+        print("{:<24} {:>10} {:>10} {:>11.4f} {:>11.4f} {:>7.1f}x".format(
+            name, len(content), len(decoded), original_seconds, table_seconds,
+            original_seconds / table_seconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+""" Compares output size and runtime of the varipacker chunk planners """
+
+import argparse
+import timeit
+from itsybitser import hextream, varipacker
+import corpus
+
+# (label, strategy, encoding options)
+PLANNERS = (
+    ("greedy", "greedy", {}),
+    ("optimal", "optimal", {}),
+    ("greedy+copy", "greedy", {"back_references": True}),
+    ("optimal+copy", "optimal", {"back_references": True}),
+    ("greedy+palette", "greedy", {"palettes": True}),
+    ("optimal+palette", "optimal", {"palettes": True}),
+    ("greedy+huffman", "greedy", {"huffman_coding": True}),
+    ("optimal+huffman", "optimal", {"huffman_coding": True}),
+    ("greedy+zeroed", "greedy", {"zeroed": True}),
+    ("optimal+zeroed", "optimal", {"zeroed": True}),
+)
+
+
+def main():
+    """ Program entry point """
+
+    parser = argparse.ArgumentParser(
+        description="Compares output size and runtime of the varipacker chunk planners"
+    )
+    parser.add_argument("hexfiles", nargs="*", type=argparse.FileType("r", encoding="UTF-8"),
+                        help="Hextream files to use as samples (default is synthetic corpora)")
+    parser.add_argument("-s", "--size", type=int, default=65536,
+                        help="Size in bytes of each synthetic sample (default is 65536)")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="Number of timed runs, best is reported (default is 3)")
+    args = parser.parse_args()
+
+    if args.hexfiles:
+        samples = [(hexfile.name, hextream.decode(hexfile.read())) for hexfile in args.hexfiles]
+    else:
+        samples = [(name, generate(args.size)) for name, generate in corpus.CORPORA.items()]
+
+    print("{:<24} {:<16} {:>10} {:>10} {:>8} {:>9}".format(
+        "sample", "strategy", "bytes", "chars", "ratio", "seconds"))
+    for name, content in samples:
+        for label, strategy, options in PLANNERS:
+            encoded = varipacker.encode(content, strategy=strategy, **options)
+            if varipacker.decode(encoded) != content:
+                raise AssertionError("{}: {} output does not decode".format(name, label))
+            seconds = min(timeit.repeat(
+                lambda strategy=strategy, options=options: varipacker.encode(
+                    content, strategy=strategy, **options),
+                number=1, repeat=args.repeat
+            ))
+            print("{:<24} {:<16} {:>10} {:>10} {:>8.3f} {:>9.4f}".format(
+                name, label, len(content), len(encoded),
+                len(encoded) / max(len(content), 1), seconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+""" Compares memory allocation of the varipacker encoder, per planner backend,
+with the original encoder """
+
+import argparse
+import time
+import tracemalloc
+from itsybitser import hextream, segmenter, varipacker
+import corpus
+import legacy
+
+
+def main():
+    """ Program entry point """
+
+    parser = argparse.ArgumentParser(
+        description="Compares memory allocation of the varipacker encoder, per planner "
+        "backend, with the original encoder"
+    )
+    parser.add_argument("hexfiles", nargs="*", type=argparse.FileType("r", encoding="UTF-8"),
+                        help="Hextream files to use as samples (default is synthetic corpora)")
+    parser.add_argument("-s", "--size", type=int, default=4194304,
+                        help="Size in bytes of each synthetic sample (default is 4194304)")
+    parser.add_argument("-b", "--backend", choices=segmenter.BACKENDS,
+                        help="Planner backend to measure (default is each one installed)")
+    args = parser.parse_args()
+
+    if args.hexfiles:
+        samples = [(hexfile.name, hextream.decode(hexfile.read())) for hexfile in args.hexfiles]
+    else:
+        samples = [(name, generate(args.size)) for name, generate in corpus.CORPORA.items()]
+
+    if args.backend == "numpy" and segmenter.numpy is None:
+        parser.error("the numpy backend requires NumPy to be installed")
+    encoders = [("original", legacy.varipacker_encode)]
+    for backend in [args.backend] if args.backend else segmenter.BACKENDS:
+        if backend == "numpy" and segmenter.numpy is None:
+            print("# NumPy is not installed, skipping numpy backend")
+            continue
+        encoders.append((
+            backend,
+            lambda content, backend=backend: varipacker.encode(content, backend=backend)
+        ))
+    print("{:<24} {:<10} {:>10} {:>14} {:>10} {:>9}".format(
+        "sample", "encoder", "bytes", "peak alloc", "peak/byte", "seconds"))
+    for name, content in samples:
+        for encoder_name, encoder in encoders:
+            tracemalloc.start()
+            start_time = time.perf_counter()
+            encoder(content)
+            seconds = time.perf_counter() - start_time
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print("{:<24} {:<10} {:>10} {:>14} {:>10.1f} {:>9.3f}".format(
+                name, encoder_name, len(content), peak, peak / max(len(content), 1), seconds))
+
+if __name__ == "__main__":
+    main()
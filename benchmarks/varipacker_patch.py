@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+""" Compares patch packing against whole-image packing, per diff backend """
+
+import argparse
+import random
+import timeit
+from itsybitser import imagediff, imagepatch, varipacker
+import corpus
+
+
+def main():
+    """ Program entry point """
+
+    parser = argparse.ArgumentParser(
+        description="Compares patch packing against whole-image packing, per diff backend"
+    )
+    parser.add_argument("-s", "--size", type=int, default=1048576,
+                        help="Image size in bytes (default is 1M)")
+    parser.add_argument("-c", "--corpus", choices=sorted(corpus.CORPORA), default="memory",
+                        help="Synthetic corpus to sample (default is memory)")
+    parser.add_argument("-n", "--changes", type=int, default=4,
+                        help="Number of changed regions (default is 4)")
+    parser.add_argument("-r", "--repeat", type=int, default=1,
+                        help="Number of timed runs, best is reported (default is 1)")
+    args = parser.parse_args()
+
+    base = corpus.CORPORA[args.corpus](args.size)
+    generator = random.Random(corpus.SEED)
+    target = bytearray(base)
+    for _ in range(args.changes):
+        start = generator.randrange(args.size)
+        for position in range(start, min(start + generator.randint(1, 64), args.size)):
+            target[position] = generator.randrange(256)
+    target = bytes(target)
+
+    encoders = []
+    for backend in imagediff.BACKENDS:
+        if backend == "numpy" and imagediff.numpy is None:
+            print("# NumPy is not installed, skipping numpy backend")
+            continue
+        encoders.append((
+            "patch/" + backend,
+            lambda backend=backend: imagepatch.encode(base, target, backend=backend)
+        ))
+    encoders.append(("whole", lambda: varipacker.encode(target)))
+
+    print("{:>10} {:<14} {:>10} {:>9}".format("bytes", "encoder", "chars", "seconds"))
+    for name, encoder in encoders:
+        encoded = encoder()
+        if name.startswith("patch") and imagepatch.apply(encoded, base) != target:
+            raise AssertionError("{}: patch does not reproduce target".format(name))
+        seconds = min(timeit.repeat(encoder, number=1, repeat=args.repeat))
+        print("{:>10} {:<14} {:>10} {:>9.4f}".format(args.size, name, len(encoded), seconds))
+
+if __name__ == "__main__":
+    main()
@@ -63,6 +63,20 @@ ABBREVIATIONS = [
     ["XIO", "X."]
 ]
 
+_LINE_TERMINATORS = "\n\r" + ATASCII_LINEFEED
+_STATEMENT_TERMINATORS = ":'" + _LINE_TERMINATORS
+_HEX_DIGITS = "0123456789abcdefABCDEF"
+# Characters skipped between statements
+_NEUTRAL_RUN = re.compile("[ :{}]*".format(_LINE_TERMINATORS))
+# Code characters that do not change the scan state
+_CODE_RUN = re.compile("[^ \"{}]*".format(_STATEMENT_TERMINATORS))
+_SPACE_RUN = re.compile(" *")
+_STRING_RUN = re.compile('[^"$]*')
+_COMMENT_RUN = re.compile("[^{}]*".format(_LINE_TERMINATORS))
+# Keywords whose preceding space is restored after spaces are stripped
+_AND_PATTERN = re.compile("[A-Z]AND")
+_OR_PATTERN = re.compile(".[A-Z]OR")
+
 class ScanState(Enum):
     """ Current state while lexing the BASIC code  """
     NEUTRAL = 0
@@ -98,57 +112,88 @@ def minify(infile, outfile, max_width):
     outfile.write(ATASCII_LINEFEED.join(line_list))
 
 def scan_for_statements(source):
-    """ Scans source, builds statement list while ignoring comments and expanding abbreviations """
-    line_terminators = "\n\r" + ATASCII_LINEFEED
-    statement_terminators = ":'" + line_terminators
+    """ Scans source, builds statement list while ignoring comments and expanding abbreviations
+
+    Runs of characters that cannot change the scan state (comment text,
+    string contents, and code other than spaces, quotes and terminators)
+    are consumed with a single compiled pattern match each, so the scan
+    is linear in the length of source.
+    """
     statement_list = []
     accumulator = []
     state = ScanState.NEUTRAL
     last_space_position = None
-    match_tree = build_match_tree(ABBREVIATIONS)
     source += ":"   # Colon is a sentinel needed to resolve final statement
-    for char in source:
+    source_length = len(source)
+    position = 0
+    while position < source_length:
         if state == ScanState.NEUTRAL:
+            position = _NEUTRAL_RUN.match(source, position).end()
+            if position == source_length:
+                break
+            char = source[position]
+            position += 1
             if char == '"':
                 state = ScanState.STRING
                 accumulator.append('"')
             elif char in "'.":
                 state = ScanState.COMMENT
-            elif char not in " " + statement_terminators:
+            else:
                 state = ScanState.CODE
                 accumulator.append(char)
         elif state == ScanState.CODE:
-            if char in statement_terminators:
-                statement = abbreviate(match_tree, "".join(accumulator))
+            run_end = _CODE_RUN.match(source, position).end()
+            if last_space_position is not None:
+                # AND/OR only gain a space when completed 2 or 3 characters
+                # after the last space, so only those are checked
+                check_end = min(run_end, position + 3 - (len(accumulator) - last_space_position))
+                for char in source[position:check_end]:
+                    accumulator.append(char)
+                    distance = len(accumulator) - last_space_position
+                    if distance == 3:
+                        if _AND_PATTERN.match("".join(accumulator[-4:]).upper()):
+                            accumulator.insert(last_space_position, " ")
+                    elif distance == 2:
+                        if _OR_PATTERN.match("".join(accumulator[-4:]).upper()):
+                            accumulator.insert(last_space_position, " ")
+                position = max(position, check_end)
+            accumulator.extend(source[position:run_end])
+            # The sentinel ends every run of code
+            char = source[run_end]
+            position = run_end + 1
+            if char in _STATEMENT_TERMINATORS:
+                statement = abbreviate(MATCH_TREE, "".join(accumulator))
                 statement_list.append(statement)
                 accumulator = []
                 if char == "'":
                     state = ScanState.COMMENT
                 else:
                     state = ScanState.NEUTRAL
-            elif char != " ":
+            elif char == '"':
                 accumulator.append(char)
-                if char == '"':
-                    state = ScanState.STRING
-                else:
-                    tail_window = ("".join(accumulator[-4:])).upper()
-                    if re.match("[A-Z]AND", tail_window) and len(accumulator) - last_space_position == 3:
-                        accumulator.insert(last_space_position, " ")
-                    elif re.match(".[A-Z]OR", tail_window) and len(accumulator) - last_space_position == 2:
-                        accumulator.insert(last_space_position, " ")
+                state = ScanState.STRING
             else:
+                position = _SPACE_RUN.match(source, position).end()
                 last_space_position = len(accumulator)
         elif state == ScanState.STRING:
+            run_end = _STRING_RUN.match(source, position).end()
+            accumulator.extend(source[position:run_end])
+            position = run_end
+            if position == source_length:
+                break
+            char = source[position]
+            position += 1
             if char == "$":
                 state = ScanState.HEX
                 hex_accumulator = []
             else:
                 accumulator.append(char)
-                if char == '"':
-                    state = ScanState.CODE
+                state = ScanState.CODE
         elif state == ScanState.HEX:
+            char = source[position]
+            position += 1
             hex_accumulator.append(char)
-            if re.match("[0-9a-fA-F]", char):
+            if char in _HEX_DIGITS:
                 if len(hex_accumulator) == 2:
                     escape_value = int("".join(hex_accumulator), 16)
                     accumulator.append(chr(escape_value))
@@ -158,8 +203,8 @@ def scan_for_statements(source):
                 accumulator.extend(hex_accumulator)
                 state = ScanState.STRING
         else:    # state is ScanState.COMMENT (by elimination of all others)
-            if char in line_terminators:
-                state = ScanState.NEUTRAL
+            position = _COMMENT_RUN.match(source, position).end() + 1
+            state = ScanState.NEUTRAL
     return statement_list
 
 def build_output_line_list(statement_list, max_width):
@@ -204,6 +249,8 @@ def build_match_tree(abbreviation_list):
         tree_node[word[-1]] = abbreviation
     return match_tree
 
+MATCH_TREE = build_match_tree(ABBREVIATIONS)
+
 def test_abbreviate_nothing():
     """ test abbreviate() with empty string arg. """
     statement = ""
@@ -248,5 +295,20 @@ def test_build_match_tree_with_pairs():
     tree = build_match_tree(abbreviation_list)
     assert repr(tree) == repr(expected_tree)
 
+def test_scan_for_statements_comments():
+    """ test scan_for_statements() with comments and statement terminators """
+    source = "' Header\nPRINT \"HI\" : POSITION 1,2 ' trailing\n. old style\nENDPROC"
+    assert scan_for_statements(source) == ['?"HI"', "POS.1,2", "ENDP."]
+
+def test_scan_for_statements_strings():
+    """ test scan_for_statements() with string content and hex escapes """
+    source = 'PRINT "A: \'B$41$4G$"C"\n'
+    assert scan_for_statements(source) == ['?"A: \'BA$4G$"C"']
+
+def test_scan_for_statements_and_or():
+    """ test scan_for_statements() keeps the space before AND/OR """
+    source = "IF X AND Y OR Z THEN Q=1\nIF XOR1 THEN Q=2"
+    assert scan_for_statements(source) == ["I.X ANDY ORZTHENQ=1", "I.XOR1THENQ=2"]
+
 if __name__ == "__main__":
     main()
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
-""" Extract 8x8 monochrome glyphs from a PNG-format "sprite atlas" file """
+""" Extract glyphs (8x8 monochrome by default) from a PNG-format "sprite atlas" file """
 
 import sys
 import argparse
-from itsybitser.glyphset import GlyphSet
+from itsybitser.glyphset import (
+    GLYPH_HEIGHT, GLYPH_WIDTH, MAX_BITS_PER_PIXEL, GlyphSet, render_remap_table
+)
 
 def main():
     """ Process command line arguments and use GlyphSet to render selected glyphs """
@@ -18,8 +20,15 @@ def main():
                 result.append(int(extents[0]))
         return result
 
+    def color_list(arg):
+        try:
+            return [tuple(bytes.fromhex(color)) for color in arg.split(",")]
+        except ValueError as error:
+            raise argparse.ArgumentTypeError("invalid color list: {!r}".format(arg)) from error
+
     parser = argparse.ArgumentParser(
-        description="Extracts 8x8 monochrome glyphs from a PNG-format \"sprite atlas\" file"
+        description="Extracts glyphs (8x8 monochrome by default) from a PNG-format "
+        "\"sprite atlas\" file"
     )
     parser.add_argument(
         dest="infile",
@@ -39,10 +48,89 @@ def main():
         #nargs=1,
         help="Relative position(s) (starting with 0) of glyph(s) to extract (default is all)"
     )
+    parser.add_argument(
+        "-W",
+        "--width",
+        type=int,
+        default=GLYPH_WIDTH,
+        help="Width of each glyph in pixels (default is {})".format(GLYPH_WIDTH)
+    )
+    parser.add_argument(
+        "-H",
+        "--height",
+        type=int,
+        default=GLYPH_HEIGHT,
+        help="Height of each glyph in pixels (default is {})".format(GLYPH_HEIGHT)
+    )
+    parser.add_argument(
+        "-b",
+        "--bits-per-pixel",
+        type=int,
+        default=1,
+        choices=range(1, MAX_BITS_PER_PIXEL + 1),
+        metavar="1-{}".format(MAX_BITS_PER_PIXEL),
+        help="Bits per pixel value (default is 1)"
+    )
+    parser.add_argument(
+        "-c",
+        "--palette",
+        metavar="RRGGBB,RRGGBB,...",
+        type=color_list,
+        help="Color of each pixel value, in order; pixels take the value of the nearest color "
+        "(default is white/black by brightness at 1 bit per pixel, otherwise evenly spaced greys)"
+    )
+    parser.add_argument(
+        "-u",
+        "--unique",
+        action="store_true",
+        help="Extract only distinct glyphs, followed by a table mapping each glyph position "
+        "to its distinct glyph"
+    )
+    parser.add_argument(
+        "-m",
+        "--mirror",
+        action="store_true",
+        help="With --unique, treat horizontally mirrored glyphs as the same glyph"
+    )
+    parser.add_argument(
+        "-f",
+        "--flip",
+        action="store_true",
+        help="With --unique, treat vertically flipped glyphs as the same glyph"
+    )
+    parser.add_argument(
+        "-r",
+        "--remap-file",
+        type=argparse.FileType("w", encoding="UTF-8"),
+        help="With --unique, name of file in which to write the remap table "
+        "(default is after the glyph data)"
+    )
 
     args = parser.parse_args()
-    glyphset = GlyphSet(args.infile)
-    args.outfile.write(glyphset.render_glyphs(args.glyph_positions) + "\n")
+    if (args.mirror or args.flip or args.remap_file) and not args.unique:
+        parser.error("--mirror, --flip and --remap-file require --unique")
+    # Only the glyphs requested are loaded from the atlas
+    try:
+        glyphset = GlyphSet(
+            args.infile, args.glyph_positions, glyph_width=args.width, glyph_height=args.height,
+            bits_per_pixel=args.bits_per_pixel, palette=args.palette
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    if args.unique:
+        glyph_positions = args.glyph_positions
+        if glyph_positions is None:
+            glyph_positions = list(range(0, glyphset.rows * glyphset.columns))
+        unique_positions, remap = glyphset.find_unique_glyphs(
+            glyph_positions, mirror=args.mirror, flip=args.flip
+        )
+        args.outfile.write(glyphset.render_glyphs(unique_positions) + "\n")
+        remap_file = args.remap_file or args.outfile
+        remap_file.write(
+            render_remap_table(glyph_positions, remap, args.mirror or args.flip)
+        )
+    else:
+        args.outfile.write(glyphset.render_glyphs() + "\n")
 
 if __name__ == "__main__":
     main()
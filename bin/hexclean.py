@@ -19,10 +19,11 @@ def main():
                         default=sys.stdout)
     args = parser.parse_args()
 
-    hex_content = args.infile.read()
-    binary_content = hextream.decode(hex_content)
-    hex_content = hextream.encode(binary_content)
-    args.outfile.write(hex_content)
+    # Stream a block at a time, so that inputs of any size can be cleaned
+    encoder = hextream.StreamEncoder(args.outfile)
+    for binary_content in hextream.iter_decode(args.infile):
+        encoder.write(binary_content)
+    encoder.finish()
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
 """ Packs/unpacks Hextream content to/from the Varipacker format """
 
+import mmap
+import os
 import sys
+import time
 import argparse
-from itsybitser import hextream, varipacker
+from concurrent.futures import ProcessPoolExecutor
+from itsybitser import hextream, imagepatch, packcache, varipacker
+
+READ_BLOCK_SIZE = 65536
+PACKED_EXTENSION = ".varp"
+UNPACKED_EXTENSION = ".hxst"
+BINARY_EXTENSION = ".bin"
+MEBIBYTE = 1024 * 1024
 
 def main():
     """ Program entry point """
@@ -16,32 +26,282 @@ def main():
                           help="Pack Hextream content into Varipacker format")
     commands.add_argument("-u", "--unpack", action="store_true",
                           help="Unpack Varipacker content into Hextream format")
-    parser.add_argument('infile', nargs='?', type=argparse.FileType('r', encoding="UTF-8"),
-                        help="Name of file with content to be packed/unpacked",
-                        default=sys.stdin)
-    parser.add_argument('outfile', nargs='?', type=argparse.FileType('w', encoding="UTF-8"),
-                        help="Name of file in which to write packed/unpacked content",
-                        default=sys.stdout)
+    parser.add_argument('files', nargs='*', metavar="file",
+                        help="Name of file with content to be packed/unpacked, then name of "
+                        "file in which to write the result (default is standard input/output); "
+                        "with --output-dir, any number of files with content to be "
+                        "packed/unpacked")
     parser.add_argument("-c", "--comment", type=str,
                         help="Prepend the output with specified comment string")
     parser.add_argument("-n", "--omit-newline", action="store_true",
                         help="The ending newline character(s) will be omitted from the output")
+    parser.add_argument("-b", "--binary", action="store_true",
+                        help="Pack raw binary content, or unpack into raw binary content, "
+                        "instead of Hextream (comment and newline options then apply only "
+                        "to packed output)")
+    parser.add_argument("-s", "--strategy", choices=["greedy", "optimal"], default="greedy",
+                        help="Chunk planning strategy used when packing (default is greedy)")
+    parser.add_argument("-r", "--back-references", action="store_true",
+                        help="Pack repeated content as copies of earlier content (not "
+                        "supported by decoders predating COPY chunks)")
+    parser.add_argument("--palettes", action="store_true",
+                        help="Pack streams of few distinct values as indexes into a palette "
+                        "of those values, where shorter (not supported by decoders "
+                        "predating palette chunks)")
+    parser.add_argument("--huffman", action="store_true",
+                        help="Pack content with skewed byte frequencies as Huffman coded "
+                        "chunks, where shorter (not supported by decoders predating "
+                        "Huffman chunks)")
+    parser.add_argument("-z", "--zeroed", action="store_true",
+                        help="Pack runs of zeros as gaps, for decoders that unpack into "
+                        "memory that has already been cleared")
+    parser.add_argument("-B", "--base", type=str, metavar="basefile",
+                        help="Name of file with a base image (Hextream, or raw binary with "
+                        "--binary): packing emits a patch that turns the base into the "
+                        "content, skipping unchanged regions; unpacking applies a patch "
+                        "to the base")
+    parser.add_argument("-d", "--output-dir", type=str,
+                        help="Pack/unpack each input file into a file of the same base name, "
+                        "with a {}/{} (or {}) extension, in this directory".format(
+                            PACKED_EXTENSION, UNPACKED_EXTENSION, BINARY_EXTENSION))
+    parser.add_argument("-m", "--manifest", type=argparse.FileType('r', encoding="UTF-8"),
+                        help="Name of file listing further input files, one per line "
+                        "(requires --output-dir)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="Number of files to pack/unpack concurrently with --output-dir "
+                        "(default is the number of CPUs)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Pack without reading or writing the cache of packed content")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="Remove all packed content from the cache before packing")
+    parser.add_argument("--cache-dir", type=str, default=packcache.default_directory(),
+                        help="Directory holding the cache (default is {})".format(
+                            packcache.default_directory()))
+    parser.add_argument("--cache-size", type=int,
+                        default=packcache.DEFAULT_MAX_SIZE // MEBIBYTE,
+                        help="Maximum total size of the cache in MiB (default is {})".format(
+                            packcache.DEFAULT_MAX_SIZE // MEBIBYTE))
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Report cache hits and misses on standard error")
     args = parser.parse_args()
 
-    source_content = args.infile.read()
+    options = {
+        "pack": args.pack,
+        "comment": args.comment,
+        "omit_newline": args.omit_newline,
+        "binary": args.binary,
+        "strategy": args.strategy,
+        "back_references": args.back_references,
+        "palettes": args.palettes,
+        "huffman_coding": args.huffman,
+        "zeroed": args.zeroed,
+        "cache_dir": None if args.no_cache else args.cache_dir,
+        "cache_size": args.cache_size * MEBIBYTE,
+        "base": args.base
+    }
+    if args.base is not None and args.zeroed:
+        parser.error("--zeroed cannot be used with --base, as a patch must write zeros")
+    if args.clear_cache:
+        packcache.PackCache(args.cache_dir).clear()
+
+    if args.output_dir is None:
+        if args.manifest or len(args.files) > 2:
+            parser.error("multiple input files require --output-dir")
+        in_mode, out_mode = file_modes(options)
+        infile = open_argument(parser, args.files[0] if args.files else "-", in_mode)
+        outfile = open_argument(parser, args.files[1] if len(args.files) > 1 else "-", out_mode)
+        cache = open_cache(options)
+        try:
+            convert(infile, outfile, options, cache)
+        except ValueError as error:
+            sys.stderr.write("{}: {}\n".format(infile.name, error))
+            sys.exit(1)
+        if args.verbose and cache is not None:
+            report_cache(cache.hits, cache.misses)
+    else:
+        if args.jobs < 1:
+            parser.error("--jobs must be at least 1")
+        in_paths = list(args.files)
+        if args.manifest:
+            in_paths.extend(read_manifest(args.manifest))
+        if not in_paths:
+            parser.error("no input files specified")
+        if args.pack:
+            extension = PACKED_EXTENSION
+        else:
+            extension = BINARY_EXTENSION if args.binary else UNPACKED_EXTENSION
+        out_paths = [
+            os.path.join(
+                args.output_dir, os.path.splitext(os.path.basename(in_path))[0] + extension
+            )
+            for in_path in in_paths
+        ]
+        if len(set(out_paths)) < len(out_paths):
+            parser.error("input files must have distinct base names")
+        os.makedirs(args.output_dir, exist_ok=True)
+        succeeded, hits, misses = convert_files(in_paths, out_paths, options, args.jobs)
+        if args.verbose and options["pack"] and options["cache_dir"] is not None:
+            report_cache(hits, misses)
+        if not succeeded:
+            sys.exit(1)
+
+def open_argument(parser, path, mode):
+    """ Opens a file named on the command line, as argparse.FileType would """
+    try:
+        return argparse.FileType(mode, encoding=None if "b" in mode else "UTF-8")(path)
+    except argparse.ArgumentTypeError as error:
+        parser.error(str(error))
+
+def file_modes(options):
+    """ Modes in which to open the input and output files
+
+    Varipacker content is read and written as ASCII bytes, and Hextream
+    content as text """
+    hextream_mode = "b" if options["binary"] else ""
+    if options["pack"]:
+        return ("r" + hextream_mode, "wb")
+    return ("rb", "w" + hextream_mode)
+
+def read_manifest(manifest):
+    """ Lists the file names in a manifest, skipping blank lines and comments """
+    return [
+        line.strip() for line in manifest
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+
+def open_cache(options):
+    """ Opens the cache of packed content, if it is used """
+    if not options["pack"] or options["cache_dir"] is None:
+        return None
+    return packcache.PackCache(options["cache_dir"], options["cache_size"])
+
+def report_cache(hits, misses):
+    """ Writes cache hit and miss counts to standard error """
+    sys.stderr.write("Cache: {} hits, {} misses\n".format(hits, misses))
+
+def convert_files(in_paths, out_paths, options, jobs):
+    """ Packs/unpacks files concurrently, reporting on each
+
+    Returns whether all succeeded, and the total cache hits and misses """
+    succeeded = True
+    hits = misses = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(convert_file, in_path, out_path, options)
+            for in_path, out_path in zip(in_paths, out_paths)
+        ]
+        for in_path, out_path, future in zip(in_paths, out_paths, futures):
+            try:
+                seconds, in_size, out_size, file_hits, file_misses = future.result()
+            except (OSError, ValueError) as error:
+                sys.stderr.write("{}: {}\n".format(in_path, error))
+                succeeded = False
+                continue
+            print("{} -> {}: {} -> {} bytes, ratio {:.3f}, {:.3f} seconds".format(
+                in_path, out_path, in_size, out_size, out_size / max(in_size, 1), seconds))
+            hits += file_hits
+            misses += file_misses
+    return (succeeded, hits, misses)
 
-    if args.pack:
-        binary_content = hextream.decode(source_content)
-        output_content = varipacker.encode(binary_content)
+def convert_file(in_path, out_path, options):
+    """ Packs/unpacks one named file into another
+
+    The output file is removed if packing/unpacking fails, so that no
+    partial output is left behind.  Returns timing, file sizes, and cache
+    hits and misses """
+    start_time = time.perf_counter()
+    cache = open_cache(options)
+    in_mode, out_mode = file_modes(options)
+    with open(in_path, in_mode, encoding=None if "b" in in_mode else "UTF-8") as infile:
+        try:
+            with open(out_path, out_mode,
+                      encoding=None if "b" in out_mode else "UTF-8") as outfile:
+                convert(infile, outfile, options, cache)
+        except BaseException:
+            if os.path.exists(out_path):
+                os.remove(out_path)
+            raise
+    seconds = time.perf_counter() - start_time
+    hits, misses = (0, 0) if cache is None else (cache.hits, cache.misses)
+    return (seconds, os.path.getsize(in_path), os.path.getsize(out_path), hits, misses)
+
+def convert(infile, outfile, options, cache=None):
+    """ Packs/unpacks the content of one file into another
+
+    The files must be opened in the modes given by file_modes() """
+
+    header = "# {}\n".format(options["comment"]) if options["comment"] else ""
+    trailer = "" if options["omit_newline"] else "\n"
+
+    if options["pack"]:
+        if options["binary"]:
+            packed_content = pack_binary(infile, options, cache)
+        else:
+            binary_content = b"".join(hextream.iter_decode(infile, READ_BLOCK_SIZE))
+            packed_content = pack_content(binary_content, options, cache)
+        outfile.write(header.encode("utf-8"))
+        outfile.write(packed_content)
+        outfile.write(trailer.encode("ascii"))
+    elif options["base"] is not None:
+        patched_content = imagepatch.apply(
+            varipacker.distill(infile.read().decode("utf-8")), read_base(options)
+        )
+        if options["binary"]:
+            outfile.write(patched_content)
+        else:
+            outfile.write(header)
+            encoder = hextream.StreamEncoder(outfile)
+            encoder.write(patched_content)
+            encoder.finish()
+            outfile.write(trailer)
+    elif options["binary"]:
+        for binary_content in varipacker.iter_decode(infile, READ_BLOCK_SIZE):
+            outfile.write(binary_content)
     else:
-        binary_content = varipacker.decode(varipacker.distill(source_content))
-        output_content = hextream.encode(binary_content)
-
-    if args.comment:
-        args.outfile.write("# {}\n".format(args.comment))
-    args.outfile.write(output_content)
-    if not args.omit_newline:
-        args.outfile.write("\n")
+        outfile.write(header)
+        encoder = hextream.StreamEncoder(outfile)
+        for binary_content in varipacker.iter_decode(infile, READ_BLOCK_SIZE):
+            encoder.write(binary_content)
+        encoder.finish()
+        outfile.write(trailer)
+
+def read_base(options):
+    """ Reads the base image named by the options, in the input format """
+    with open(options["base"], "rb" if options["binary"] else "r",
+              encoding=None if options["binary"] else "UTF-8") as basefile:
+        if options["binary"]:
+            return basefile.read()
+        return b"".join(hextream.iter_decode(basefile, READ_BLOCK_SIZE))
+
+def pack_binary(infile, options, cache):
+    """ Packs the raw binary content of a file
+
+    The file is memory-mapped where possible, so the encoder reads it in
+    place; empty files, pipes and the like are read instead. """
+    try:
+        mapping = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return pack_content(infile.read(), options, cache)
+    with mapping, memoryview(mapping) as content:
+        return pack_content(content, options, cache)
+
+def pack_content(content, options, cache):
+    """ Packs binary content, with the strategy and encodings selected by options
+
+    With a base image, a patch is packed instead, bypassing the cache (see
+    imagepatch.encode() for the ValueError raised if the content is
+    shorter than the base) """
+    if options["base"] is not None:
+        return imagepatch.encode(
+            read_base(options), content, strategy=options["strategy"],
+            back_references=options["back_references"], palettes=options["palettes"],
+            huffman_coding=options["huffman_coding"]
+        ).encode("ascii")
+    return varipacker.encode_bytes(
+        content, strategy=options["strategy"], cache=cache,
+        back_references=options["back_references"], palettes=options["palettes"],
+        huffman_coding=options["huffman_coding"], zeroed=options["zeroed"]
+    )
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,11 @@
 """ Common functionality between varipacker and hextream modules """
 
-import re
+COMPARE_BLOCK_SIZE = 65536
+
+# Deletes the ASCII characters for which str.isspace() is true
+_DELETE_ASCII_WHITESPACE = dict.fromkeys(
+    [code for code in range(128) if chr(code).isspace()]
+)
 
 def compare(content1, content2):
     """ Compares two strings
@@ -12,16 +17,33 @@ def compare(content1, content2):
 
     - if strings are the same, will return -1
     - if strings are different, will return the (0-based) index of the
-      first character where they differ """
+      first character where they differ (if one is a prefix of the
+      other, that is the length of the shorter) """
+
+    difference = locate_difference(content1, content2)
+    return -1 if difference is None else difference[0]
+
+def compare_distilled(content1, content2):
+    """ Compares two strings that have already been distilled
+
+    Returns -1 if they are the same, otherwise the (0-based) index of
+    the first character where they differ """
 
-    result = -1
-    distilled_content1 = distill(content1)
-    distilled_content2 = distill(content2)
-    if distilled_content1 != distilled_content2:
-        result = 0
-        while distilled_content1[result] == distilled_content2[result]:
-            result += 1
-    return result
+    if content1 == content2:
+        return -1
+    length = min(len(content1), len(content2))
+    position = 0
+    block_size = COMPARE_BLOCK_SIZE
+    # Narrow down to the first differing block with whole-slice comparisons
+    while block_size > 1:
+        while (position + block_size <= length
+               and content1[position:position + block_size]
+               == content2[position:position + block_size]):
+            position += block_size
+        block_size //= 16
+    while position < length and content1[position] == content2[position]:
+        position += 1
+    return position
 
 def distill(content):
     """ Removes whitespace and comments from string
@@ -31,8 +53,102 @@ def distill(content):
     sequences starting with "#" and extending to the end-of-line from the
     passed-in string. """
 
-    # Eliminate comments
-    result = re.sub("#.*$", "", content, flags=re.MULTILINE)
-    # Eliminate all whitespace (split by default splits on any WS char)
-    result = ''.join(result.split())
-    return result
+    # Eliminate comments: whatever follows each "#" up to the next line feed
+    pieces = content.split("#")
+    if len(pieces) > 1:
+        content = pieces[0] + "".join([piece.partition("\n")[2] for piece in pieces[1:]])
+    # Eliminate all whitespace, as split() would, translating ASCII quickly
+    content = content.translate(_DELETE_ASCII_WHITESPACE)
+    if not content.isascii():
+        content = "".join(content.split())
+    return content
+
+def locate_difference(content1, content2):
+    """ Finds where two strings first differ, ignoring whitespace and comments
+
+    Each content may be a string or a text file object.  Both are read
+    and distilled a block of lines at a time, in parallel, stopping at
+    the first difference, so that large contents which differ early are
+    not processed as a whole.
+
+    - if they are the same, will return None
+    - if they differ, will return a tuple of the (0-based) index where
+      they first differ in the distilled contents, then the
+      corresponding indexes in each of the original contents (the length
+      of a content, if the difference is that it ends) """
+
+    blocks1 = _distilled_blocks(content1)
+    blocks2 = _distilled_blocks(content2)
+    block1 = next(blocks1)
+    block2 = next(blocks2)
+    position1 = position2 = distilled_index = 0
+    while block1[0] and block2[0]:
+        length = min(len(block1[0]) - position1, len(block2[0]) - position2)
+        piece1 = block1[0][position1:position1 + length]
+        piece2 = block2[0][position2:position2 + length]
+        if piece1 != piece2:
+            mismatch = compare_distilled(piece1, piece2)
+            position1 += mismatch
+            position2 += mismatch
+            distilled_index += mismatch
+            break
+        position1 += length
+        position2 += length
+        distilled_index += length
+        if position1 == len(block1[0]):
+            block1, position1 = next(blocks1), 0
+        if position2 == len(block2[0]):
+            block2, position2 = next(blocks2), 0
+    if not block1[0] and not block2[0]:
+        return None
+    return (
+        distilled_index,
+        _original_index(block1, position1),
+        _original_index(block2, position2)
+    )
+
+def _distilled_blocks(content):
+    """ Yields (distilled text, offset, original text) for blocks of whole lines
+
+    Blocks that distill to nothing are skipped; the last block yielded
+    is empty, with an offset of the length of the content. """
+
+    offset = 0
+    for text in _line_blocks(content):
+        distilled = distill(text)
+        if distilled:
+            yield (distilled, offset, text)
+        offset += len(text)
+    yield ("", offset, "")
+
+def _line_blocks(content):
+    """ Splits content into blocks of about COMPARE_BLOCK_SIZE, at line ends """
+    if isinstance(content, str):
+        start = 0
+        while start < len(content):
+            end = content.find("\n", start + COMPARE_BLOCK_SIZE - 1) + 1 or len(content)
+            yield content[start:end]
+            start = end
+    else:
+        text = content.read(COMPARE_BLOCK_SIZE)
+        while text:
+            if not text.endswith("\n"):
+                text += content.readline()
+            yield text
+            text = content.read(COMPARE_BLOCK_SIZE)
+
+def _original_index(block, position):
+    """ Works out the index in the original content of a distilled block position """
+    _, offset, text = block
+    for line in text.split("\n"):
+        code = line.partition("#")[0]
+        code_length = len(distill(code))
+        if position < code_length:
+            for index, character in enumerate(code):
+                if not character.isspace():
+                    if not position:
+                        return offset + index
+                    position -= 1
+        position -= code_length
+        offset += len(line) + 1
+    return offset - 1
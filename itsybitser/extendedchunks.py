@@ -0,0 +1,114 @@
+""" Writes and reads the payloads of the extended VariPacker chunk encodings
+
+A palette chunk's payload starts with the palette size less 1, then 2
+sextets per palette value, then an index into the palette per byte,
+packed as a TriadStream or a SextetStream; like the payload of any other
+stream chunk, the indexes are packed and unpacked by varipacker.  A
+HUFFMAN chunk's payload starts with the number of symbols less 1 and the
+number of sextets of coded content (2 sextets each), then 2 sextets per
+symbol (4 bits of code length less 1, 8 bits of value), then the content
+coded as by the huffman module. """
+
+from collections import Counter
+from itsybitser import huffman
+
+SEXTET_MASK = 0b00111111
+LOW_DYAD_MASK = 0b00000011
+MAX_TRIAD_PALETTE_SIZE = 8
+MAX_SEXTET_PALETTE_SIZE = 64
+HUFFMAN_COUNTS_LENGTH = 4
+
+
+def palette_length(palette_size):
+    """ Number of sextets of a palette chunk payload that precede the indexes """
+    return 1 + 2 * palette_size
+
+def write_palette(sextets, position, content, max_palette_size):
+    """ Writes the palette of the distinct values in content into a buffer of sextets
+
+    Returns the index into the palette of each byte of content, and the
+    position following the palette """
+    palette = sorted(set(content))
+    if len(palette) > max_palette_size:
+        raise ValueError("Unable to encode {} distinct values in a palette of at most {}".format(
+            len(palette), max_palette_size))
+    sextets[position] = len(palette) - 1
+    for value in palette:
+        position += 2
+        sextets[position - 1] = value >> 6
+        sextets[position] = value & SEXTET_MASK
+    index_table = bytearray(256)
+    for index, value in enumerate(palette):
+        index_table[value] = index
+    return (bytes(content).translate(index_table), position + 1)
+
+def read_palette(payload):
+    """ Reads the palette at the start of a palette chunk payload (as sextets)
+
+    Returns the palette values, as bytes, and the position of the indexes """
+    indexes_start = palette_length(payload[0] + 1)
+    palette = bytes([
+        (high << 6) + low
+        for high, low in zip(payload[1:indexes_start:2], payload[2:indexes_start:2])
+    ])
+    return (palette, indexes_start)
+
+def look_up_palette(palette, indexes):
+    """ Replaces each index by the palette value it refers to """
+    if indexes and max(indexes) >= len(palette):
+        raise ValueError("Palette index {} is outside a palette of {} values".format(
+            max(indexes), len(palette)))
+    return bytes(indexes).translate(palette.ljust(256, b"\x00"))
+
+def huffman_payload_length(content):
+    """ Number of sextets of a HUFFMAN chunk payload coding content """
+    if not len(content):
+        return 0
+    frequencies = Counter(content)
+    lengths = huffman.code_lengths(frequencies)
+    return HUFFMAN_COUNTS_LENGTH + 2 * len(lengths) + huffman.sextet_count(frequencies, lengths)
+
+def huffman_payload_end(sextets, payload_start):
+    """ Position following a HUFFMAN chunk payload, given where it starts
+
+    Returns None if the sextets end before the counts that give it """
+    if payload_start + HUFFMAN_COUNTS_LENGTH > len(sextets):
+        return None
+    symbol_count = (sextets[payload_start] << 6) + sextets[payload_start + 1] + 1
+    coded_length = (sextets[payload_start + 2] << 6) + sextets[payload_start + 3]
+    return payload_start + HUFFMAN_COUNTS_LENGTH + 2 * symbol_count + coded_length
+
+def write_huffman_payload(sextets, position, content):
+    """ Writes the code length of each distinct value in content, then the coded content
+
+    Returns the position following the payload """
+    if not len(content):
+        return position
+    lengths = huffman.code_lengths(Counter(content))
+    coded = huffman.encode(content, lengths)
+    for count in (len(lengths) - 1, len(coded)):
+        sextets[position] = count >> 6
+        sextets[position + 1] = count & SEXTET_MASK
+        position += 2
+    for value in sorted(lengths):
+        sextets[position] = ((lengths[value] - 1) << 2) + (value >> 6)
+        sextets[position + 1] = value & SEXTET_MASK
+        position += 2
+    sextets[position:position + len(coded)] = coded
+    return position + len(coded)
+
+def decode_huffman_payload(payload, length):
+    """ Decodes up to length bytes from a HUFFMAN chunk payload (as sextets)
+
+    Returns no bytes if the payload ends within its code length table """
+    if len(payload) < HUFFMAN_COUNTS_LENGTH:
+        return b""
+    table_end = HUFFMAN_COUNTS_LENGTH + 2 * ((payload[0] << 6) + payload[1] + 1)
+    table = payload[HUFFMAN_COUNTS_LENGTH:table_end]
+    if len(table) < table_end - HUFFMAN_COUNTS_LENGTH:
+        return b""
+    lengths = {
+        ((high & LOW_DYAD_MASK) << 6) + low: (high >> 2) + 1
+        for high, low in zip(table[0::2], table[1::2])
+    }
+    return huffman.decode(payload[table_end:], lengths, length)
@@ -1,45 +1,177 @@
-""" Reads 8x8 monochrome glyphs from a PNG-format "sprite atlas" file """
+""" Reads glyphs (8x8 monochrome by default) from a PNG-format "sprite atlas" file """
 
 import png
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 BLACK_THRESHOLD = 64
 GLYPH_WIDTH = 8
 GLYPH_HEIGHT = 8
 RGB_LENGTH = 3
+MAX_BITS_PER_PIXEL = 8
+# Transform flags of glyph remap table entries
+MIRRORED = 1
+FLIPPED = 2
+
+# Hextream rendering of each possible 8x8 monochrome glyph row byte, commented
+# with an ASCII rendering
+_RENDERED_ROWS = [
+    "{:02X} # {}".format(byte, format(byte, "08b").replace("0", "  ").replace("1", "[]"))
+    for byte in range(256)
+]
+_BIT_CHARACTER_TABLE = bytes.maketrans(b"\x00\x01", b"01")
+_MIRROR_TABLE = bytes([int(format(byte, "08b")[::-1], 2) for byte in range(256)])
 
 
 class GlyphSet:
-    """ Reads 8x8 monochrome glyphs from a PNG-format "sprite atlas" file
+    """ Reads glyphs from a PNG-format "sprite atlas" file
+
+    The atlas is divided into cells of glyph_width x glyph_height
+    pixels, and each pixel becomes a value of bits_per_pixel bits: the
+    index of the nearest color in the palette, if one is given.  Without
+    a palette, at one bit per pixel a pixel is set if the sum of its
+    color components exceeds BLACK_THRESHOLD, and at more bits per pixel
+    the palette is evenly spaced greys from black to white.
+
+    The glyphs are held bit-packed: each glyph row is packed leftmost
+    pixel first into whole bytes (the last byte padded with zero bits),
+    with the rows of each glyph stored together, so the bytes of a glyph
+    are a single slice.  The pixels are packed with array operations if
+    NumPy is installed, otherwise a whole image row at a time, whatever
+    the geometry.
+
+    The PNG rows are read one at a time, and only the bands of
+    glyph_height rows holding requested glyphs are kept, so memory use
+    is proportional to the number of glyphs requested rather than to
+    the size of the image.
 
     Args:
         png_file (variant): Filename or file handle or bytes
+        glyph_indexes (list): Indexes of the glyphs to load, all within the atlas
+            (default is all)
+        glyph_width (int): Width of a glyph in pixels
+        glyph_height (int): Height of a glyph in pixels
+        bits_per_pixel (int): Bits per pixel value, 1 to MAX_BITS_PER_PIXEL
+        palette (list): (red, green, blue) color of each pixel value
     """
 
-    def __init__(self, png_file):
+    def __init__(self, png_file, glyph_indexes=None, glyph_width=GLYPH_WIDTH,
+                 glyph_height=GLYPH_HEIGHT, bits_per_pixel=1, palette=None):
+        if glyph_width < 1 or glyph_height < 1:
+            raise ValueError("Glyph width and height must be at least 1")
+        if not 1 <= bits_per_pixel <= MAX_BITS_PER_PIXEL:
+            raise ValueError(
+                "Bits per pixel must be from 1 to {}".format(MAX_BITS_PER_PIXEL)
+            )
+        if palette is not None:
+            palette = [tuple(color) for color in palette]
+            if not 1 <= len(palette) <= 2 ** bits_per_pixel or any(
+                    len(color) != RGB_LENGTH for color in palette):
+                raise ValueError("Palette must have 1 to {} (red, green, blue) colors".format(
+                    2 ** bits_per_pixel
+                ))
+        elif bits_per_pixel > 1:
+            top_value = 2 ** bits_per_pixel - 1
+            palette = [(round(value * 255 / top_value),) * RGB_LENGTH
+                       for value in range(top_value + 1)]
+
         reader = png.Reader(png_file)
         width, height, rgb_content, _ = reader.asRGB8()
 
-        self.rows = height // GLYPH_HEIGHT
-        self.columns = width // GLYPH_WIDTH
-        self._mono_content = []
+        self.glyph_width = glyph_width
+        self.glyph_height = glyph_height
+        self.bits_per_pixel = bits_per_pixel
+        self.palette = palette
+        self.row_length = (glyph_width * bits_per_pixel + 7) // 8
+        self.rows = height // glyph_height
+        self.columns = width // glyph_width
+        self._glyph_indexes = glyph_indexes
+        if glyph_indexes is None:
+            wanted_bands = set(range(self.rows))
+        else:
+            for glyph_index in glyph_indexes:
+                self._check_index(glyph_index)
+            wanted_bands = {glyph_index // self.columns for glyph_index in glyph_indexes}
 
-        for row in rgb_content:
-            self._mono_content.append([
-                int(sum(row[i:i+RGB_LENGTH]) > BLACK_THRESHOLD)
-                for i in range(0, RGB_LENGTH * width, RGB_LENGTH)
-            ])
+        pack_band = self._pack_band_python if numpy is None else self._pack_band_numpy
+        self._bands = {}
+        band_rows = []
+        for row_index, row in enumerate(rgb_content):
+            if len(self._bands) == len(wanted_bands):
+                break
+            if row_index // glyph_height in wanted_bands:
+                band_rows.append(row)
+                if len(band_rows) == glyph_height:
+                    self._bands[row_index // glyph_height] = pack_band(band_rows)
+                    band_rows = []
+
+    def find_unique_glyphs(self, glyph_indexes=None, mirror=False, flip=False):
+        """ Finds the distinct glyphs among a list of glyphs (or all glyphs loaded)
+
+        Glyphs are looked up by their bytes in a hash index.  With mirror
+        and/or flip, a glyph that is a horizontal mirror image and/or a
+        vertically flipped copy of an earlier glyph is not distinct.
+
+        Returns the indexes of the distinct glyphs, and for each glyph a
+        (position in the distinct glyphs, transform flags) tuple, where
+        the flags (MIRRORED, FLIPPED) give the transforms to apply to the
+        distinct glyph to reproduce it. """
+
+        if glyph_indexes is None:
+            glyph_indexes = self._glyph_indexes
+        if glyph_indexes is None:
+            glyph_indexes = list(range(0, self.rows * self.columns))
+        transforms = [
+            flags for flags in range((MIRRORED | FLIPPED) + 1)
+            if (mirror or not flags & MIRRORED) and (flip or not flags & FLIPPED)
+        ]
+        unique_indexes = []
+        index = {}
+        remap = []
+        for glyph_index in glyph_indexes:
+            content = self.glyph_bytes(glyph_index)
+            for flags in transforms:
+                position = index.get(self._transform(content, flags))
+                if position is not None:
+                    remap.append((position, flags))
+                    break
+            else:
+                index[content] = len(unique_indexes)
+                remap.append((len(unique_indexes), 0))
+                unique_indexes.append(glyph_index)
+        return (unique_indexes, remap)
+
+    def glyph_bytes(self, glyph_index):
+        """ Returns the bytes of a glyph, row_length per row, top row first """
+        self._check_index(glyph_index)
+        band_index, column = divmod(glyph_index, self.columns)
+        try:
+            band = self._bands[band_index]
+        except KeyError as error:
+            raise ValueError("Glyph {} was not loaded".format(glyph_index)) from error
+        glyph_length = self.row_length * self.glyph_height
+        return band[column * glyph_length:(column + 1) * glyph_length]
+
+    def glyph_values(self, glyph_index):
+        """ Returns the pixel values of a glyph, a list per row, top row first """
+        return [self._row_values(row) for row in self._glyph_rows(self.glyph_bytes(glyph_index))]
 
     def render_glyphs(self, glyph_indexes=None):
         """ Renders a list of glyphs (or all glyphs)
 
         Renders glyphs indicated by the provided list of integers, or all
-        glyphs in the PNG file (if glyph_indexes is omitted), in hextream
-        format which can then be encoded into ASCII using varipack.
+        glyphs loaded from the PNG file (if glyph_indexes is omitted), in
+        hextream format which can then be encoded into ASCII using varipack.
 
         The resulting hextream has comments containing an ASCII rendering
         of the glyphs, for easier identification.
         """
         rendered_glyphs = []
+        if glyph_indexes is None:
+            glyph_indexes = self._glyph_indexes
         if glyph_indexes is None:
             glyph_indexes = list(range(0, self.rows * self.columns))
         for glyph_index in glyph_indexes:
@@ -53,29 +185,174 @@ class GlyphSet:
         format which can then be encoded into ASCII using varipack.
 
         The resulting hextream has comments containing an ASCII rendering
-        of the glyph, for easier identification.
+        of the glyph, for easier identification: two characters per
+        pixel, "[]" for a set pixel at one bit per pixel, otherwise the
+        pixel value in hexadecimal (blank for zero).
         """
-        ascii_rows = []
-        hex_bytes = []
-        for row in self._get_glyph_content(glyph_index):
-            hex_bytes.append(format(int("".join([str(pixel) for pixel in row]), 2), "02X"))
-            ascii_rows.append("".join([["  ", "[]"][pixel] for pixel in row]))
-        body = "\n".join([
-            "{} # {}".format(pair[0], pair[1])
-            for pair in zip(hex_bytes, ascii_rows)
-        ])
+        content = self.glyph_bytes(glyph_index)
+        if self.glyph_width == GLYPH_WIDTH and self.bits_per_pixel == 1:
+            body = "\n".join([_RENDERED_ROWS[byte] for byte in content])
+        else:
+            if self.bits_per_pixel == 1:
+                pixels = ["  ", "[]"]
+            elif self.bits_per_pixel <= 4:
+                pixels = ["  "] + [format(value, "X") * 2 for value in range(1, 16)]
+            else:
+                pixels = ["  "] + [format(value, "02X") for value in range(1, 256)]
+            body = "\n".join([
+                "{} # {}".format(
+                    row.hex(" ").upper(),
+                    "".join([pixels[value] for value in self._row_values(row)])
+                )
+                for row in self._glyph_rows(content)
+            ])
         head = "{:#^21}".format(" Glyph " + str(glyph_index) + " ")
         return "{}\n{}\n".format(head, body)
 
-    def _get_glyph_content(self, glyph_index):
-        x_pos, y_pos = self._get_glyph_origin(glyph_index)
-        glyph_content = [
-            row[x_pos:x_pos+GLYPH_WIDTH]
-            for row in self._mono_content[y_pos:y_pos + GLYPH_HEIGHT]
+    def _check_index(self, glyph_index):
+        """ Raises a ValueError if a glyph index is outside the atlas """
+        if not 0 <= glyph_index < self.rows * self.columns:
+            raise ValueError("Glyph position {} is outside the atlas of {} glyphs".format(
+                glyph_index, self.rows * self.columns
+            ))
+
+    def _glyph_rows(self, content):
+        """ Splits the bytes of a glyph into its rows """
+        return [
+            content[start:start + self.row_length]
+            for start in range(0, len(content), self.row_length)
+        ]
+
+    def _row_values(self, row):
+        """ Unpacks the pixel values of a glyph row, leftmost first """
+        bit_count = self.glyph_width * self.bits_per_pixel
+        packed = int.from_bytes(row, "big") >> (self.row_length * 8 - bit_count)
+        mask = 2 ** self.bits_per_pixel - 1
+        return [
+            (packed >> shift) & mask
+            for shift in range(bit_count - self.bits_per_pixel, -1, -self.bits_per_pixel)
+        ]
+
+    def _pack_row(self, values):
+        """ Packs the pixel values of a glyph row, leftmost first """
+        packed = 0
+        for value in values:
+            packed = (packed << self.bits_per_pixel) | value
+        packed <<= self.row_length * 8 - self.glyph_width * self.bits_per_pixel
+        return packed.to_bytes(self.row_length, "big")
+
+    def _transform(self, content, flags):
+        """ Mirrors and/or flips the bytes of a glyph """
+        if self.glyph_width == GLYPH_WIDTH and self.bits_per_pixel == 1:
+            if flags & MIRRORED:
+                content = content.translate(_MIRROR_TABLE)
+            if flags & FLIPPED:
+                content = content[::-1]
+            return content
+        rows = self._glyph_rows(content)
+        if flags & MIRRORED:
+            rows = [self._pack_row(self._row_values(row)[::-1]) for row in rows]
+        if flags & FLIPPED:
+            rows = rows[::-1]
+        return b"".join(rows)
+
+    def _pack_band_numpy(self, band_rows):
+        """ Packs the glyphs in a band of RGB rows using array operations """
+        pixels = numpy.frombuffer(b"".join([bytes(row) for row in band_rows]), dtype=numpy.uint8)
+        pixels = pixels.reshape(self.glyph_height, -1, RGB_LENGTH)
+        pixels = pixels[:, :self.columns * self.glyph_width]
+        if self.palette is None:
+            values = pixels.sum(axis=2, dtype=numpy.uint16) > BLACK_THRESHOLD
+        else:
+            differences = (
+                pixels[:, :, numpy.newaxis, :].astype(numpy.int32)
+                - numpy.array(self.palette, dtype=numpy.int32)
+            )
+            values = (differences * differences).sum(axis=3).argmin(axis=2)
+            del differences
+            # Expand each value to its bits_per_pixel bits, most significant first
+            values = numpy.unpackbits(
+                values.astype(numpy.uint8)[:, :, numpy.newaxis], axis=2
+            )[:, :, 8 - self.bits_per_pixel:]
+        # Pack each glyph row separately, so that it is padded to whole bytes
+        packed_rows = numpy.packbits(
+            values.reshape(
+                self.glyph_height, self.columns, self.glyph_width * self.bits_per_pixel
+            ),
+            axis=2
+        )
+        # Reorder from (glyph pixel row, glyph column) to glyph-major
+        return packed_rows.transpose(1, 0, 2).tobytes()
+
+    def _pack_band_python(self, band_rows):
+        """ Packs the glyphs in a band of RGB rows, a whole row of pixels at a time """
+        pixel_count = self.columns * self.glyph_width
+        glyph_bit_count = self.glyph_width * self.bits_per_pixel
+        padding = "0" * (self.row_length * 8 - glyph_bit_count)
+        value_bits = [
+            format(value, "0{}b".format(self.bits_per_pixel))
+            for value in range(2 ** self.bits_per_pixel)
         ]
-        return glyph_content
+        nearest_values = {}
+        band_row_length = self.columns * self.row_length
+        packed_rows = []
+        for row in band_rows:
+            pixels = zip(row[0::3], row[1::3], row[2::3])
+            if self.palette is None:
+                bits = bytes([
+                    red + green + blue > BLACK_THRESHOLD for red, green, blue in pixels
+                ][:pixel_count]).translate(_BIT_CHARACTER_TABLE).decode("ascii")
+            else:
+                values = []
+                for color in pixels:
+                    value = nearest_values.get(color)
+                    if value is None:
+                        value = nearest_values[color] = self._nearest_value(color)
+                    values.append(value)
+                bits = "".join([value_bits[value] for value in values[:pixel_count]])
+            if padding:
+                bits = padding.join([
+                    bits[start:start + glyph_bit_count]
+                    for start in range(0, len(bits), glyph_bit_count)
+                ]) + padding
+            packed_rows.append(int(bits or "0", 2).to_bytes(band_row_length, "big"))
+        band = b"".join(packed_rows)
+        if self.row_length == 1:
+            return b"".join([band[column::self.columns] for column in range(self.columns)])
+        return b"".join([
+            band[start:start + self.row_length]
+            for column_start in range(0, band_row_length, self.row_length)
+            for start in range(column_start, len(band), band_row_length)
+        ])
 
-    def _get_glyph_origin(self, glyph_index):
-        start_row = glyph_index // self.columns
-        start_column = glyph_index % self.columns
-        return (start_column * GLYPH_WIDTH, start_row * GLYPH_HEIGHT)
+    def _nearest_value(self, color):
+        """ Returns the value of the palette color nearest to a color """
+        distances = [
+            sum([(component - palette_component) ** 2
+                 for component, palette_component in zip(color, palette_color)])
+            for palette_color in self.palette
+        ]
+        return distances.index(min(distances))
+
+
+def render_remap_table(glyph_indexes, remap, with_flags=False):
+    """ Renders a glyph remap table, as found by GlyphSet.find_unique_glyphs
+
+    Renders, in hextream format, an entry per glyph: the position of
+    its distinct glyph (one byte, or two bytes low byte first when there
+    are more than 256 distinct glyphs), then if with_flags, a byte of
+    transform flags.  The hextream has comments describing each entry.
+    """
+    index_length = 1 if max([position for position, _ in remap] + [0]) < 256 else 2
+    lines = ["{:#^21}".format(" Remap table ")]
+    for glyph_index, (position, flags) in zip(glyph_indexes, remap):
+        entry = position.to_bytes(index_length, "little")
+        description = "Glyph {}: distinct glyph {}".format(glyph_index, position)
+        if with_flags:
+            entry += bytes([flags])
+            if flags & MIRRORED:
+                description += ", mirrored"
+            if flags & FLIPPED:
+                description += ", flipped"
+        lines.append("{} # {}".format(entry.hex(" ").upper(), description))
+    return "\n".join(lines) + "\n"
@@ -1,9 +1,41 @@
 """ Module to encode and decode binary data as ASCII hexadecimal characters """
 
-import textwrap
 from itsybitser import asciiencoding
 
 WRAP_BYTES_PER_LINE = 16
+READ_BLOCK_SIZE = 65536
+
+_UPPERCASE_X_TABLE = str.maketrans("x", "X")
+_DELETE_PREFIX_CHARACTERS_TABLE = str.maketrans("", "", "\\X$")
+
+class StreamEncoder:
+    """ Incrementally encodes binary data as ASCII hexadecimal characters
+
+    Content passed to write() in pieces of any size is written to a text
+    file object, laid out exactly as encode() would lay out the whole
+    content.  Only a partial line of bytes is held between calls. """
+
+    def __init__(self, outfile):
+        self._outfile = outfile
+        self._pending = b""
+        self._separator = ""
+
+    def write(self, content):
+        """ Encodes and writes the whole lines completed by a piece of content """
+        pending = self._pending + bytes(content)
+        whole_lines_length = len(pending) - len(pending) % WRAP_BYTES_PER_LINE
+        if whole_lines_length:
+            self._outfile.write(self._separator + encode(pending[:whole_lines_length]))
+            self._separator = "\n"
+        self._pending = pending[whole_lines_length:]
+
+    def finish(self):
+        """ Encodes and writes whatever remains once all content has been written """
+        if self._pending:
+            self._outfile.write(self._separator + encode(self._pending))
+            self._separator = "\n"
+        self._pending = b""
+
 
 def compare(content1, content2):
     """ Compares two hextreams
@@ -16,22 +48,69 @@ def compare(content1, content2):
     - if hextreams are the same, will return -1
     - if hextreams are different, will return the (0-based) index of the
       first character where they differ """
-    return asciiencoding.compare(distill(content1), distill(content2))
+    return asciiencoding.compare_distilled(distill(content1), distill(content2))
 
 def decode(content):
-    """ Decode binary data from ASCII hexadecimal characters """
-    return bytes.fromhex(distill(content))
+    """ Decode binary data from ASCII hexadecimal characters
+
+    Comments, whitespace and prefixes are removed by a few whole-string
+    passes; bytes.fromhex() accepts either case, so the content is not
+    uppercased. """
+    return bytes.fromhex(_strip_prefixes(asciiencoding.distill(content)))
 
 def distill(content):
     """ Strip out comments, whitespace, and hex string prefix characters """
-    result = asciiencoding.distill(content.upper())
-    filter_prefix_characters = str.maketrans("", "", "\\xX$")
-    result = result.replace("0X", "").translate(filter_prefix_characters)
-    return result
+    return _strip_prefixes(asciiencoding.distill(content)).upper()
 
 def encode(content):
-    """ Encode binary data as ASCII hexadecimal characters """
-    result = " ".join([format(byte, "02X") for byte in content])
-    # Break into lines of no more than 16 byte representations
-    result = "\n".join(textwrap.wrap(result, width=(WRAP_BYTES_PER_LINE * 3 - 1)))
-    return result
+    """ Encode binary data as ASCII hexadecimal characters
+
+    Lines hold WRAP_BYTES_PER_LINE byte representations, so each line is
+    cut from the space-separated hexadecimal at a fixed stride. """
+    result = content.hex(" ").upper()
+    line_length = WRAP_BYTES_PER_LINE * 3 - 1
+    return "\n".join([
+        result[start:start + line_length]
+        for start in range(0, len(result), line_length + 1)
+    ])
+
+def iter_decode(infile, block_size=READ_BLOCK_SIZE):
+    """ Decode binary data from a file of ASCII hexadecimal characters, a block at a time
+
+    Comments, "0x" prefixes and hexadecimal digit pairs may all be split
+    across blocks: the state needed to join them (whether a comment is
+    open, a trailing "0" and an unpaired digit) is carried from one
+    block to the next, so memory use does not grow with the content.
+    Yields the decoded bytes of each block. """
+
+    in_comment = False
+    pending_zero = ""
+    pending_digit = ""
+    content = infile.read(block_size)
+    while content:
+        if in_comment:
+            comment_end = content.find("\n")
+            in_comment = comment_end < 0
+            content = "" if in_comment else content[comment_end:]
+        comment_start = content.rfind("#")
+        if comment_start > content.rfind("\n"):
+            content = content[:comment_start]
+            in_comment = True
+        # Hold back a trailing "0" that could start a "0X" prefix
+        result = pending_zero + asciiencoding.distill(content).translate(_UPPERCASE_X_TABLE)
+        pending_zero = "0" if result.endswith("0") else ""
+        result = pending_digit + _strip_prefixes(result[:len(result) - len(pending_zero)])
+        # Hold back a digit that will be paired with the next block's first
+        pending_digit = result[len(result) - len(result) % 2:]
+        result = bytes.fromhex(result[:len(result) - len(pending_digit)])
+        if result:
+            yield result
+        content = infile.read(block_size)
+    result = bytes.fromhex(pending_digit + pending_zero)
+    if result:
+        yield result
+
+def _strip_prefixes(content):
+    """ Removes "0x", "\\x" and "$" prefixes from distilled content """
+    result = content.translate(_UPPERCASE_X_TABLE).replace("0X", "")
+    return result.translate(_DELETE_PREFIX_CHARACTERS_TABLE)
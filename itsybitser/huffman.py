@@ -0,0 +1,110 @@
+""" Builds canonical Huffman codes, and packs coded bytes into sextets
+
+A canonical code is fully described by the code length of each symbol:
+codes are assigned in order of length, then of symbol value, each being
+the previous code plus one (shifted left whenever the length grows).  So
+only the lengths need to be stored alongside the coded content.  Coded
+bits are packed most significant first, 6 to a sextet, as used by the
+VariPacker character alphabet. """
+
+import heapq
+
+BITS_PER_SEXTET = 6
+MAX_CODE_LENGTH = 16
+
+# Bits of each sextet value, as a string of binary digits
+_SEXTET_BITS = [format(sextet & 0x3f, "06b") for sextet in range(256)]
+
+
+def code_lengths(frequencies, max_length=MAX_CODE_LENGTH):
+    """ Works out the code length of each symbol, for a Huffman code
+
+    Takes a mapping of symbols (byte values) to their frequencies, and
+    returns a mapping of the same symbols to their code lengths.  A lone
+    symbol gets a length of 1.  If some code would be longer than
+    max_length, the frequencies are halved (but kept above 0) until none
+    is, which flattens the code only as much as needed. """
+    if len(frequencies) > 2 ** max_length:
+        raise ValueError("Unable to code {} symbols in at most {} bits".format(
+            len(frequencies), max_length))
+    while True:
+        lengths = _huffman_lengths(frequencies)
+        if max(lengths.values(), default=0) <= max_length:
+            return lengths
+        frequencies = {
+            symbol: (frequency + 1) // 2 for symbol, frequency in frequencies.items()
+        }
+
+def _huffman_lengths(frequencies):
+    if len(frequencies) == 1:
+        return {symbol: 1 for symbol in frequencies}
+    lengths = {symbol: 0 for symbol in frequencies}
+    # (frequency, tie breaker, symbols in subtree)
+    heap = [
+        (frequency, symbol, [symbol]) for symbol, frequency in sorted(frequencies.items())
+    ]
+    heapq.heapify(heap)
+    while len(heap) > 1:
+        frequency1, order, symbols1 = heapq.heappop(heap)
+        frequency2, _, symbols2 = heapq.heappop(heap)
+        for symbol in symbols1 + symbols2:
+            lengths[symbol] += 1
+        heapq.heappush(heap, (frequency1 + frequency2, order, symbols1 + symbols2))
+    return lengths
+
+def canonical_codes(lengths):
+    """ Assigns the canonical code of each symbol, given the code lengths
+
+    Returns a mapping of symbols to codes, as strings of binary digits """
+    codes = {}
+    code = 0
+    previous_length = 0
+    for symbol, length in sorted(lengths.items(), key=lambda item: (item[1], item[0])):
+        code <<= length - previous_length
+        codes[symbol] = format(code, "0{}b".format(length))
+        code += 1
+        previous_length = length
+    return codes
+
+def sextet_count(frequencies, lengths):
+    """ Number of sextets that content with these symbol frequencies is coded in """
+    bit_count = sum([frequency * lengths[symbol] for symbol, frequency in frequencies.items()])
+    return -(-bit_count // BITS_PER_SEXTET)
+
+def encode(content, lengths):
+    """ Codes each byte of content, returning the bits packed into sextets
+
+    The last sextet is padded with zero bits """
+    codes = canonical_codes(lengths)
+    bits = "".join([codes[value] for value in content])
+    bits += "0" * (-len(bits) % BITS_PER_SEXTET)
+    return bytes([
+        int(bits[position:position + BITS_PER_SEXTET], 2)
+        for position in range(0, len(bits), BITS_PER_SEXTET)
+    ])
+
+def decode(sextets, lengths, count):
+    """ Decodes up to count bytes from coded bits packed into sextets
+
+    Decoding stops early, without error, where the sextets run out. """
+    if sum([2 ** -length for length in lengths.values()]) > 1:
+        raise ValueError("Huffman code lengths do not form a prefix code")
+    if not lengths:
+        return b""
+    symbols = {code: symbol for symbol, code in canonical_codes(lengths).items()}
+    distinct_lengths = sorted(set(lengths.values()))
+    bits = "".join([_SEXTET_BITS[sextet] for sextet in sextets])
+    result = bytearray()
+    position = 0
+    while len(result) < count:
+        for length in distinct_lengths:
+            symbol = symbols.get(bits[position:position + length])
+            if symbol is not None:
+                break
+        else:
+            if position + distinct_lengths[-1] <= len(bits):
+                raise ValueError("Invalid Huffman code at bit {}".format(position))
+            break
+        result.append(symbol)
+        position += length
+    return bytes(result)
@@ -0,0 +1,86 @@
+""" Finds the ranges in which one binary image differs from another
+
+The images are compared a block at a time, and only blocks that differ
+are searched further, by halving them until they are small enough to
+compare byte by byte.  So unchanged regions, typically most of an image,
+cost a single in-place comparison per block.  When NumPy is installed
+the differing bytes are found with array operations instead. """
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BACKENDS = ("python", "numpy")
+BLOCK_SIZE = 4096
+# Parts of a block no longer than this are compared byte by byte
+SCAN_LENGTH = 32
+
+
+def default_backend():
+    """ Name of the backend used when none is specified """
+    return "python" if numpy is None else "numpy"
+
+def changed_ranges(base, target, backend=None):
+    """ Finds the ranges of target that differ from base
+
+    Returns a list of (start, end) tuples for the maximal ranges of
+    positions at which the bytes of target and base differ, ordered by
+    start.  Any part of target beyond the end of base counts as changed;
+    any part of base beyond the end of target is ignored. """
+
+    if backend is None:
+        backend = default_backend()
+    try:
+        finder = {
+            "python": _changed_ranges_python,
+            "numpy": _changed_ranges_numpy
+        }[backend]
+    except KeyError as error:
+        raise ValueError("Unrecognized backend \"{}\"".format(backend)) from error
+    if backend == "numpy" and numpy is None:
+        raise ValueError("The numpy backend requires NumPy to be installed")
+    base = bytes(base)
+    target = bytes(target)
+    common_length = min(len(base), len(target))
+    ranges = finder(base, target, common_length) if common_length else []
+    if len(target) > common_length:
+        if ranges and ranges[-1][1] == common_length:
+            ranges[-1] = (ranges[-1][0], len(target))
+        else:
+            ranges.append((common_length, len(target)))
+    return ranges
+
+def _changed_ranges_python(base, target, length):
+    ranges = []
+    for block_start in range(0, length, BLOCK_SIZE):
+        _find_changes(base, target, block_start, min(block_start + BLOCK_SIZE, length), ranges)
+    return [tuple(changed_range) for changed_range in ranges]
+
+def _find_changes(base, target, start, end, ranges):
+    """ Adds the changes between start and end to ranges, a list of [start, end] lists
+
+    A change directly following the last range extends it. """
+    if base[start:end] == target[start:end]:
+        return
+    if end - start > SCAN_LENGTH:
+        middle = (start + end) // 2
+        _find_changes(base, target, start, middle, ranges)
+        _find_changes(base, target, middle, end, ranges)
+        return
+    for position in range(start, end):
+        if base[position] != target[position]:
+            if ranges and ranges[-1][1] == position:
+                ranges[-1][1] = position + 1
+            else:
+                ranges.append([position, position + 1])
+
+def _changed_ranges_numpy(base, target, length):
+    changed = numpy.zeros(length + 2, dtype=bool)
+    numpy.not_equal(
+        numpy.frombuffer(base, dtype=numpy.uint8, count=length),
+        numpy.frombuffer(target, dtype=numpy.uint8, count=length),
+        out=changed[1:-1]
+    )
+    edges = numpy.flatnonzero(changed[1:] != changed[:-1])
+    return list(zip(edges[0::2].tolist(), edges[1::2].tolist()))
@@ -0,0 +1,76 @@
+""" Packs the changes between two binary images as a VariPacker patch
+
+A patch is ordinary VariPacker content in which the regions that are
+unchanged from the base image are skipped with GAP chunks, so decoding
+it over memory already holding the base leaves the target image.  The
+changed regions are found with imagediff. """
+
+from itsybitser import imagediff, varipacker
+
+# Unchanged spans shorter than this are re-encoded in patches, rather than
+# skipped with a GAP chunk (costing a header, plus the header of the chunk
+# that follows it)
+MIN_PATCH_GAP = 8
+
+
+def encode(base, target, strategy="greedy", backend=None, back_references=False,
+           palettes=False, huffman_coding=False):
+    """ Encode the changes from base to target as VariPacker patch content
+
+    Unchanged regions are skipped with GAP chunks, and changed regions
+    (merged where less than MIN_PATCH_GAP bytes apart) are encoded as by
+    varipacker.encode(), with the same options.  Changed regions are
+    found by comparing the images a block at a time (see imagediff),
+    using the backend given, so even megabyte images are compared
+    quickly.  The patch ends with the last changed region.  Decoding it
+    over base with varipacker.decode_into() (or apply()) gives target.
+    A patch can only overwrite or extend base, so a target shorter than
+    base is rejected with a ValueError. """
+
+    # Checked before any view of target is held, so that the caller can
+    # release target (e.g. close a memory map) while handling the error
+    with memoryview(target) as view, memoryview(base) as base_view:
+        target_length = view.nbytes
+        base_length = base_view.nbytes
+    if target_length < base_length:
+        raise ValueError("Target ({} bytes) is shorter than base ({} bytes)".format(
+            target_length, base_length))
+    target = memoryview(target).cast("B")
+    pieces = []
+    position = 0
+    for start, end in _merge_ranges(imagediff.changed_ranges(base, target, backend)):
+        for gap_start in range(position, start, varipacker.MAX_CHUNK_LENGTH):
+            pieces.append(varipacker.encode_gap(
+                min(start - gap_start, varipacker.MAX_CHUNK_LENGTH)
+            ))
+        pieces.append(varipacker.encode(
+            target[start:end], strategy, backend, back_references=back_references,
+            palettes=palettes, huffman_coding=huffman_coding
+        ))
+        position = end
+    return "".join(pieces)
+
+def apply(content, base):
+    """ Applies VariPacker patch content (see encode()) to a base image
+
+    Returns the patched image: base, overwritten by the patch wherever it
+    is not skipped by a GAP chunk, and extended if the patch reaches past
+    the end of base.  Any part of base beyond the end of the patch is
+    kept (encode() never produces a patch for a shorter target). """
+
+    buffer = bytearray(base)
+    length = varipacker.decoded_length(content)
+    if length > len(buffer):
+        buffer.extend(bytes(length - len(buffer)))
+    varipacker.decode_into(content, buffer)
+    return bytes(buffer)
+
+def _merge_ranges(ranges):
+    """ Merges ranges less than MIN_PATCH_GAP apart """
+    merged = []
+    for start, end in ranges:
+        if merged and start - merged[-1][1] < MIN_PATCH_GAP:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
@@ -0,0 +1,106 @@
+""" Finds earlier occurrences of byte sequences, for back-reference chunks
+
+Positions of the content are indexed in hash chains keyed on their first
+MIN_MATCH_LENGTH bytes: a dict maps each key to the latest position
+inserted with it, and each position links to the previous position with
+the same key.  A search walks the chain for the position being matched,
+newest first, so only positions sharing a prefix with it are compared. """
+
+MIN_MATCH_LENGTH = 3
+DEFAULT_MAX_CHAIN_LENGTH = 32
+
+
+class MatchFinder:
+    """ Finds the longest earlier match for positions of some content
+
+    Positions must be inserted (in increasing order) before they can be
+    matched against; matches may overlap the position being matched, as
+    a decoder copying byte by byte reproduces them.
+
+    Args:
+        content (bytes): Content to find matches in
+        max_distance (int): Greatest distance back to a match
+        max_length (int): Greatest length of a match
+        max_chain_length (int): Most candidate positions compared per search
+    """
+
+    def __init__(self, content, max_distance, max_length,
+                 max_chain_length=DEFAULT_MAX_CHAIN_LENGTH):
+        self._content = bytes(content)
+        self._max_distance = max_distance
+        self._max_length = max_length
+        self._max_chain_length = max_chain_length
+        self._heads = {}
+        self._previous = [-1] * len(self._content)
+        # (position, length, distance) of the last match found
+        self._last_match = (-1, 0, 0)
+
+    def insert(self, position):
+        """ Indexes a position, so that later positions can match it """
+        key = self._content[position:position + MIN_MATCH_LENGTH]
+        if len(key) == MIN_MATCH_LENGTH:
+            self._previous[position] = self._heads.get(key, -1)
+            self._heads[key] = position
+
+    def insert_range(self, start, end):
+        """ Indexes the positions from start up to (not including) end """
+        for position in range(start, end):
+            self.insert(position)
+
+    def find(self, position, limit=None):
+        """ Finds the longest match for the content at a position
+
+        The match may extend no further than limit (by default, the end
+        of the content).  Returns a (length, distance) tuple, with a
+        length of 0 if there is no match of at least MIN_MATCH_LENGTH. """
+        content = self._content
+        if limit is None:
+            limit = len(content)
+        available = min(limit - position, self._max_length)
+        best_length = 0
+        best_distance = 0
+        if available < MIN_MATCH_LENGTH:
+            return (best_length, best_distance)
+        # A match found at the previous position continues at this one,
+        # less its first byte, so only longer matches need comparing
+        last_position, last_length, last_distance = self._last_match
+        if last_position == position - 1 and last_length > MIN_MATCH_LENGTH:
+            best_length = min(last_length - 1, available)
+            best_distance = last_distance
+        candidate = self._heads.get(content[position:position + MIN_MATCH_LENGTH], -1)
+        chain_length = 0
+        while (best_length < available and candidate >= 0
+               and position - candidate <= self._max_distance
+               and chain_length < self._max_chain_length):
+            # A candidate can only do better if it also matches the byte
+            # just beyond the best match so far
+            if content[candidate + best_length] == content[position + best_length]:
+                length = _match_length(content, candidate, position, available)
+                if length > best_length:
+                    best_length = length
+                    best_distance = position - candidate
+            candidate = self._previous[candidate]
+            chain_length += 1
+        if best_length < MIN_MATCH_LENGTH:
+            best_length = 0
+            best_distance = 0
+        self._last_match = (position, best_length, best_distance)
+        return (best_length, best_distance)
+
+
+def _match_length(content, source, position, available):
+    """ Length of the common prefix (up to available) of content at two positions
+
+    Found by binary search over slice comparisons, so bytes are compared
+    in bulk rather than one at a time. """
+    if content[source:source + available] == content[position:position + available]:
+        return available
+    low = 0
+    high = available
+    while high - low > 1:
+        middle = (low + high) // 2
+        if content[source:source + middle] == content[position:position + middle]:
+            low = middle
+        else:
+            high = middle
+    return low
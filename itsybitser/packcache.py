@@ -0,0 +1,118 @@
+""" On-disk cache of VariPacker output, keyed by content and encoding options """
+
+import hashlib
+import os
+import tempfile
+from itsybitser import varipacker
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+ENTRY_EXTENSION = ".varp"
+
+
+def default_directory():
+    """ Directory used for the cache when none is specified """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "itsybitser")
+
+
+class PackCache:
+    """ Stores VariPacker output in files named by a hash of their input
+
+    The key of an entry is a SHA-256 hash of the binary content, the
+    encoder version (varipacker.ENCODER_VERSION) and the encoding
+    options, so entries are never returned for output that the current
+    encoder would produce differently.  Reading an entry updates its
+    modification time, and whenever an entry is stored the least
+    recently used entries are removed until the total size of the
+    entries is no more than max_size bytes.  Entries are written
+    atomically, so several processes may share a cache directory.
+
+    Entries are stored as ASCII bytes.  Pass a PackCache as the cache
+    argument of varipacker.encode or varipacker.encode_bytes to use it;
+    hits and misses are counted in the hits and misses attributes. """
+
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE):
+        self.directory = default_directory() if directory is None else directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, content, **options):
+        """ Works out the key of the entry for content encoded with options """
+        digest = hashlib.sha256()
+        digest.update("{}\n".format(varipacker.ENCODER_VERSION).encode("ascii"))
+        for name, value in sorted(options.items()):
+            digest.update("{}={!r}\n".format(name, value).encode("utf-8"))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """ Returns the packed content stored under a key, or None if there is none """
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as entry_file:
+                packed = entry_file.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return packed
+
+    def put(self, key, packed):
+        """ Stores packed content under a key, then evicts entries beyond max_size """
+        os.makedirs(self.directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as entry_file:
+                entry_file.write(packed)
+            os.replace(temporary_path, self._entry_path(key))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        self._evict()
+
+    def clear(self):
+        """ Removes every entry from the cache """
+        for path, _ in self._list_entries():
+            _remove(path)
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key + ENTRY_EXTENSION)
+
+    def _evict(self):
+        entries = self._list_entries()
+        total_size = sum([entry_stat.st_size for _, entry_stat in entries])
+        entries.sort(key=lambda entry: entry[1].st_mtime_ns)
+        for path, entry_stat in entries:
+            if total_size <= self.max_size:
+                break
+            _remove(path)
+            total_size -= entry_stat.st_size
+
+    def _list_entries(self):
+        """ Lists (path, stat result) of every entry """
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if name.endswith(ENTRY_EXTENSION):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((path, os.stat(path)))
+                except FileNotFoundError:
+                    pass
+        return entries
+
+
+def _remove(path):
+    """ Removes a file that another process may already have removed """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,281 @@
+""" Finds the chunks claimed by the passes of the greedy varipacker planner
+
+Each pass looks at the content not claimed by earlier passes, for either
+runs of equal values (run encodings) or spans of values no greater than
+a limit (stream encodings).  Each run or span is split into pieces of at
+most max_length bytes, and the pieces long enough to be worthwhile are
+claimed.  When NumPy is installed the runs and spans are found with
+array operations, otherwise a pure Python implementation is used. """
+
+import functools
+import re
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BACKENDS = ("python", "numpy")
+# Mask elements scanned at once when listing the indexes of true elements
+NONZERO_BLOCK_SIZE = 65536
+
+
+def default_backend():
+    """ Name of the backend used when none is specified """
+    return "python" if numpy is None else "numpy"
+
+def find_chunks(content, passes, max_length, backend=None, claims=()):
+    """ Finds the chunks claimed by a sequence of passes over the content
+
+    Each pass is a (tag, value limit, minimum viable length, is run)
+    tuple.  Content covered by claims, a sequence of (start, length)
+    tuples that do not overlap, is treated as claimed before the first
+    pass.  Returns a list of (start, length, tag) tuples, ordered by
+    start.
+
+    As a run pass scans a span, the first byte of a run that directly
+    follows an incomplete (not a multiple of max_length) piece of another
+    run is not included in either run; this mirrors the scan originally
+    used by the planner, so that both backends give identical output. """
+
+    if backend is None:
+        backend = default_backend()
+    try:
+        finder = {
+            "python": _find_chunks_python,
+            "numpy": _find_chunks_numpy
+        }[backend]
+    except KeyError as error:
+        raise ValueError("Unrecognized backend \"{}\"".format(backend)) from error
+    if backend == "numpy" and numpy is None:
+        raise ValueError("The numpy backend requires NumPy to be installed")
+    return finder(content, passes, max_length, claims) if len(content) else []
+
+def _find_chunks_python(content, passes, max_length, claims):
+    chunks = []
+    claims = sorted(claims)
+    for tag, value_limit, min_viable_length, is_run in passes:
+        segments = _unclaimed_segments(
+            _segment_pattern(value_limit, is_run).finditer(content), claims
+        )
+        if is_run:
+            new_claims = _find_run_claims(segments, min_viable_length, max_length)
+        else:
+            new_claims = _find_stream_claims(segments, min_viable_length, max_length)
+        chunks.extend([(start, length, tag) for start, length in new_claims])
+        claims = sorted(claims + new_claims)
+    return sorted(chunks)
+
+@functools.lru_cache()
+def _segment_pattern(value_limit, is_run):
+    """ Pattern matching runs of equal values, or spans of values, up to a limit """
+    value_class = b"[\\x00-" + re.escape(bytes([value_limit])) + b"]"
+    if is_run:
+        pattern = b"(" + value_class + b")\\1*"
+    else:
+        pattern = value_class + b"+"
+    return re.compile(pattern, re.DOTALL)
+
+def _unclaimed_segments(matches, claims):
+    """ Yields (start, end) of the unclaimed parts of matched segments """
+    claim_index = 0
+    for match in matches:
+        start, end = match.span()
+        while claim_index < len(claims) and sum(claims[claim_index]) <= start:
+            claim_index += 1
+        index = claim_index
+        while index < len(claims) and claims[index][0] < end:
+            claim_start, claim_length = claims[index]
+            if claim_start > start:
+                yield (start, claim_start)
+            start = claim_start + claim_length
+            index += 1
+        if start < end:
+            yield (start, end)
+
+def _find_run_claims(segments, min_viable_length, max_length):
+    claims = []
+    previous_end = None
+    skip_next = False
+    for start, end in segments:
+        if start != previous_end:
+            skip_next = False
+        length = end - start - skip_next
+        if length >= min_viable_length:
+            claims.extend(_split(end - length, length, min_viable_length, max_length))
+        skip_next = bool(length % max_length)
+        previous_end = end
+    return claims
+
+def _find_stream_claims(segments, min_viable_length, max_length):
+    claims = []
+    for start, end in segments:
+        if end - start >= min_viable_length:
+            claims.extend(_split(start, end - start, min_viable_length, max_length))
+    return claims
+
+def _split(start, length, min_viable_length, max_length):
+    """ Splits a segment into claimable pieces of at most max_length """
+    pieces = [
+        (piece_start, max_length)
+        for piece_start in range(start, start + length - max_length + 1, max_length)
+    ]
+    remainder = length % max_length
+    if remainder >= min_viable_length:
+        pieces.append((start + length - remainder, remainder))
+    return pieces
+
+def _find_chunks_numpy(content, passes, max_length, claims):
+    values = numpy.frombuffer(content, dtype=numpy.uint8)
+    index_type = numpy.int32 if len(values) < 2 ** 31 - max_length else numpy.int64
+    unclaimed = numpy.ones(len(values), dtype=bool)
+    for start, length in claims:
+        unclaimed[start:start + length] = False
+    changes = numpy.ones(len(values) + 1, dtype=bool)
+    numpy.not_equal(values[1:], values[:-1], out=changes[1:-1])
+    eligible = numpy.zeros(len(values) + 2, dtype=bool)
+    # Working masks, reused by every pass rather than allocated per operation
+    run_starts = numpy.empty(len(values), dtype=bool)
+    run_ends = numpy.empty(len(values), dtype=bool)
+    edges = numpy.empty(len(values), dtype=bool)
+    chunk_arrays = []
+
+    for tag, value_limit, min_viable_length, is_run in passes:
+        numpy.less_equal(values, value_limit, out=eligible[1:-1])
+        eligible[1:-1] &= unclaimed
+        numpy.greater(eligible[1:-1], eligible[:-2], out=edges)
+        span_starts = _nonzero_indexes(edges, index_type)
+        if is_run:
+            starts, lengths = _find_runs(
+                eligible, changes, span_starts, min_viable_length, max_length,
+                (run_starts, run_ends, edges)
+            )
+        else:
+            numpy.greater(eligible[1:-1], eligible[2:], out=edges)
+            starts = span_starts
+            lengths = _nonzero_indexes(edges, index_type)
+            lengths += 1
+            lengths -= starts
+        del span_starts
+        viable = lengths >= min_viable_length
+        starts, lengths = _split_numpy(
+            starts[viable], lengths[viable], min_viable_length, max_length
+        )
+        del viable
+        chunk_arrays.append((starts, lengths, tag))
+        boundaries = numpy.zeros(len(values) + 1, dtype=numpy.int8)
+        boundaries[starts] = 1
+        boundaries[starts + lengths] -= 1
+        numpy.cumsum(boundaries, dtype=numpy.int8, out=boundaries)
+        numpy.equal(boundaries[:-1], 0, out=edges)
+        del boundaries
+        unclaimed &= edges
+
+    del unclaimed, changes, eligible, run_starts, run_ends, edges
+    chunks = [
+        (start, length, tag)
+        for starts, lengths, tag in chunk_arrays
+        for start, length in zip(starts.tolist(), lengths.tolist())
+    ]
+    chunks.sort()
+    return chunks
+
+def _nonzero_indexes(mask, index_type):
+    """ Indexes of the true elements of a mask, as an array of index_type
+
+    The indexes are found a block at a time, so no array of 64-bit
+    indexes for the whole mask is needed on the way. """
+    indexes = numpy.empty(numpy.count_nonzero(mask), dtype=index_type)
+    position = 0
+    for block_start in range(0, len(mask), NONZERO_BLOCK_SIZE):
+        block_indexes = numpy.flatnonzero(mask[block_start:block_start + NONZERO_BLOCK_SIZE])
+        indexes[position:position + len(block_indexes)] = block_indexes
+        indexes[position:position + len(block_indexes)] += block_start
+        position += len(block_indexes)
+    return indexes
+
+def _find_runs(eligible, changes, span_starts, min_viable_length, max_length, masks):
+    """ Finds the runs that could be claimed, less any skipped first byte
+
+    eligible is padded by a False element at each end, changes marks
+    where each value differs from the one before, and masks are three
+    working masks the size of the content.  Unless min_viable_length is
+    below 2, single-byte runs are never claimed, and their only part in
+    the skipping of first bytes (see find_chunks) is to invert it, which
+    _run_skips works out from the distances between the longer runs; so
+    only the longer runs are listed, which for typical content are far
+    fewer.  Returns arrays of the starts and lengths of the runs. """
+
+    run_starts, run_ends, edges = masks
+    numpy.invert(eligible[:-2], out=run_starts)
+    run_starts |= changes[:-1]
+    run_starts &= eligible[1:-1]
+    numpy.invert(eligible[2:], out=run_ends)
+    run_ends |= changes[1:]
+    run_ends &= eligible[1:-1]
+    if min_viable_length < 2:
+        starts = _nonzero_indexes(run_starts, span_starts.dtype)
+        lengths = _nonzero_indexes(run_ends, span_starts.dtype)
+    else:
+        # A run starting and ending at the same position is a single byte
+        numpy.greater(run_starts, run_ends, out=edges)
+        starts = _nonzero_indexes(edges, span_starts.dtype)
+        numpy.greater(run_ends, run_starts, out=edges)
+        lengths = _nonzero_indexes(edges, span_starts.dtype)
+    lengths += 1
+    lengths -= starts
+    if len(starts):
+        skips = _run_skips(starts, lengths, span_starts, max_length)
+        starts += skips
+        lengths -= skips
+    return (starts, lengths)
+
+def _run_skips(starts, lengths, span_starts, max_length):
+    """ Works out which of the runs found by _find_runs lose their first byte
+
+    Whether a run loses its first byte depends on whether the previous
+    run in the span did, according to the previous run's length modulo
+    max_length: 0 copies the previous result, 1 inverts it, anything
+    else means the run does lose it.  The first run in a span never
+    does.  Each single-byte run in between inverts the result again, so
+    the result is inverted by the parity of the distance from the end
+    of the previous longer run (or the start of the span).  That
+    recurrence is solved as a scan: the result is the value of the last
+    run that sets it, inverted once per inverting run since. """
+
+    anchors = span_starts[numpy.searchsorted(span_starts, starts, side="right") - 1]
+    are_first = numpy.ones(len(starts), dtype=bool)
+    are_first[1:] = starts[:-1] < anchors[1:]
+    # Parity of the single-byte runs between each run and the one before
+    anchors[1:] = numpy.where(are_first[1:], anchors[1:], starts[:-1] + lengths[:-1])
+    parities = ((starts - anchors) & 1).astype(bool)
+    del anchors
+    remainders = numpy.zeros(len(lengths), dtype=lengths.dtype)
+    remainders[1:] = lengths[:-1] % max_length
+    are_setting = are_first | (remainders > 1)
+    are_inverting = ~are_setting & (parities ^ (remainders == 1))
+    del remainders
+    set_values = parities ^ ~are_first
+    del are_first, parities
+    last_setting = numpy.arange(len(lengths), dtype=lengths.dtype)
+    last_setting[~are_setting] = 0
+    numpy.maximum.accumulate(last_setting, out=last_setting)
+    inversions = numpy.cumsum(are_inverting, dtype=numpy.int8)
+    parity = (inversions - inversions[last_setting]) & 1
+    return set_values[last_setting].astype(lengths.dtype) ^ parity
+
+def _split_numpy(starts, lengths, min_viable_length, max_length):
+    """ Splits segments into claimable pieces of at most max_length """
+    full_counts = lengths // max_length
+    remainders = lengths % max_length
+    counts = full_counts + (remainders >= min_viable_length)
+    segment_indexes = numpy.repeat(numpy.arange(len(counts), dtype=starts.dtype), counts)
+    piece_numbers = (
+        numpy.arange(counts.sum(), dtype=starts.dtype)
+        - numpy.repeat(numpy.cumsum(counts, dtype=starts.dtype) - counts, counts)
+    )
+    piece_starts = starts[segment_indexes] + piece_numbers * max_length
+    piece_lengths = numpy.where(
+        piece_numbers < full_counts[segment_indexes], max_length, remainders[segment_indexes]
+    )
+    return (piece_starts, piece_lengths)
@@ -1,7 +1,9 @@
 """ Text-encodes binary data, compressing where feasible """
 
+import functools
+from collections import deque
 from enum import Enum
-from itsybitser import asciiencoding
+from itsybitser import asciiencoding, extendedchunks, matchfinder, segmenter
 
 OFFSET = 48
 RADIX = 64
@@ -12,6 +14,45 @@ LOW_TRIAD_MASK = 0b00000111
 LOW_DYAD_MASK = 0b00000011
 LINEAR64_GROUP_LENGTH = 3
 MAX_CHUNK_LENGTH = 511
+HEADER_LENGTH = 2
+# A COPY chunk's payload is a distance of up to 12 bits, in 2 sextets
+COPY_PAYLOAD_LENGTH = 2
+MAX_COPY_DISTANCE = RADIX * RADIX - 1
+# A chunk of an extended encoding has a HEADER-encoded header, followed
+# by a selector sextet giving the encoding's value less EXTENDED_BASE
+EXTENDED_HEADER_LENGTH = HEADER_LENGTH + 1
+EXTENDED_BASE = 8
+# Payloads of extended encodings are laid out as described in extendedchunks
+MAX_TRIAD_PALETTE_SIZE = extendedchunks.MAX_TRIAD_PALETTE_SIZE
+MAX_SEXTET_PALETTE_SIZE = extendedchunks.MAX_SEXTET_PALETTE_SIZE
+# Palette sizes for which the optimal planner considers palette chunks
+PALETTE_SIZE_LIMITS = (2, 4, 8, 16, 32, 64)
+DEFAULT_ENCODE_WINDOW = 65536
+READ_BLOCK_SIZE = 65536
+# Changes whenever encode() may produce different output for the same input
+ENCODER_VERSION = 1
+
+
+# Lookup tables for decoding, indexed by character code or sextet
+_SEXTET_TABLE = bytes([(code - OFFSET) & 0xff for code in range(256)])
+_LOW_TRIAD_TABLE = bytes([sextet & LOW_TRIAD_MASK for sextet in range(256)])
+_HIGH_TRIAD_TABLE = bytes([(sextet & HIGH_TRIAD_MASK) >> 3 for sextet in range(256)])
+_HIGH_BITS_TABLES = [
+    bytes([((sextet >> (2 * group_position)) & LOW_DYAD_MASK) << 6 for sextet in range(256)])
+    for group_position in range(LINEAR64_GROUP_LENGTH)
+]
+
+# Lookup tables for encoding, indexed by byte or sextet
+_CHARACTER_TABLE = bytes([(sextet + OFFSET) & 0xff for sextet in range(256)])
+_LOW_SEXTET_TABLE = bytes([byte & SEXTET_MASK for byte in range(256)])
+_TRIAD_SHIFT_TABLE = bytes([(byte << 3) & 0xff for byte in range(256)])
+_HIGH_BITS_SHIFT_TABLES = [
+    bytes([
+        (byte & HIGH_BITS_MASK) >> (2 * (LINEAR64_GROUP_LENGTH - group_position))
+        for byte in range(256)
+    ])
+    for group_position in range(LINEAR64_GROUP_LENGTH)
+]
 
 
 class Encoding(Enum):
@@ -22,7 +63,83 @@ class Encoding(Enum):
     TRIAD_STREAM = 3
     SEXTET_STREAM = 4
     HEADER = 5
+    COPY = 6
     LINEAR64 = 7
+    # Extended encodings
+    PALETTE_TRIAD_STREAM = 8
+    PALETTE_SEXTET_STREAM = 9
+    HUFFMAN = 10
+
+
+# Encodings of the chunks the greedy planner may merge into palette chunks
+_GROUPED_ENCODINGS = (
+    Encoding.GAP, Encoding.SEXTET_RUN, Encoding.OCTET_RUN, Encoding.TRIAD_STREAM,
+    Encoding.SEXTET_STREAM, Encoding.LINEAR64
+)
+_MAX_PALETTE_SIZES = {
+    Encoding.PALETTE_TRIAD_STREAM: MAX_TRIAD_PALETTE_SIZE,
+    Encoding.PALETTE_SEXTET_STREAM: MAX_SEXTET_PALETTE_SIZE
+}
+
+
+class StreamDecoder:
+    """ Incrementally decodes VariPacker content
+
+    Content may be passed to feed() in pieces of any size, and need not
+    be distilled first: comments and whitespace are skipped as they
+    arrive.  Only the characters of a partially received chunk, and the
+    last MAX_COPY_DISTANCE decoded bytes (which COPY chunks may refer
+    back to), are held between calls, so memory use does not grow with
+    the content. """
+
+    def __init__(self):
+        self._pending = b""
+        self._in_comment = False
+        self._history = b""
+
+    def feed(self, content):
+        """ Decodes the chunks completed by a piece of VariPacker content
+
+        The content may be a str, or ASCII (or UTF-8) bytes as read from
+        a binary file.  Returns the decoded bytes (which may be empty) """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        pieces = []
+        position = 0
+        while position < len(content):
+            if self._in_comment:
+                comment_end = content.find(b"\n", position)
+                if comment_end < 0:
+                    break
+                self._in_comment = False
+                position = comment_end + 1
+            else:
+                comment_start = content.find(b"#", position)
+                if comment_start < 0:
+                    comment_start = len(content)
+                else:
+                    self._in_comment = True
+                pieces.append(content[position:comment_start])
+                position = comment_start + 1
+        characters = b"".join(b"".join(pieces).split())
+        if not characters.isascii():
+            raise ValueError("VariPacker content must be ASCII")
+        return self._decode(self._pending + characters.translate(_SEXTET_TABLE), False)
+
+    def finish(self):
+        """ Decodes whatever remains once all content has been fed
+
+        As with decode(), a chunk truncated by the end of the content
+        yields as many bytes as could be decoded from it. """
+        return self._decode(self._pending, True)
+
+    def _decode(self, sextets, is_final):
+        result = bytearray(self._history)
+        position = _decode_chunks(result, sextets, is_final)
+        self._pending = sextets[position:]
+        decoded = bytes(result[len(self._history):])
+        self._history = bytes(result[-MAX_COPY_DISTANCE:])
+        return decoded
 
 
 def compare(content1, content2):
@@ -36,174 +153,809 @@ def compare(content1, content2):
     - if they are the same, will return -1
     - if they differ, will return the (0-based) index of the
       first character where they differ """
-    return asciiencoding.compare(distill(content1), distill(content2))
+    return asciiencoding.compare(content1, content2)
 
 def decode(content):
-    """ Decode binary data from VariPacker content (ASCII) """
-
-    encoding_properties = {
-        #             (encoding, cycle length, is run encoding)
-        Encoding.GAP: (Encoding.GAP, 1, False),
-        Encoding.HEADER: (Encoding.HEADER, 2, False),
-        Encoding.LINEAR64: (Encoding.LINEAR64, 4, False),
-        Encoding.OCTET_RUN: (Encoding.OCTET_RUN, 2, True),
-        Encoding.SEXTET_RUN: (Encoding.SEXTET_RUN, 1, True),
-        Encoding.SEXTET_STREAM: (Encoding.SEXTET_STREAM, 1, False),
-        Encoding.TRIAD_STREAM: (Encoding.TRIAD_STREAM, 1, False)
-    }
+    """ Decode binary data from VariPacker content (ASCII)
+
+    Each chunk header is parsed once, and the chunk payload is then
+    decoded as a whole, using translation tables and slicing rather than
+    stepping through the content one character at a time. """
+
+    return decode_bytes(content.encode("ascii"))
+
+def decode_bytes(content):
+    """ Decode binary data from VariPacker content held as ASCII bytes
+
+    As decode(), but takes bytes (or a bytearray), e.g. as read from a
+    binary file, so that no text decoding is needed. """
 
     result = bytearray()
-    encoding, cycle_length, is_run_encoding = encoding_properties[Encoding.HEADER]
-    cycle_count = 0
+    _decode_chunks(result, bytes(content).translate(_SEXTET_TABLE))
+    return bytes(result)
 
-    for char in content:
-        sextet = ord(char) - OFFSET
-        if cycle_length > 1 and cycle_count == 0:
-            holding_sextet = sextet
+def decoded_length(content):
+    """ Number of bytes that VariPacker content decodes to, without decoding it """
+    if isinstance(content, str):
+        content = content.encode("ascii")
+    return _decoded_length(bytes(content).translate(_SEXTET_TABLE))
+
+def decode_into(content, buffer, offset=0):
+    """ Decode VariPacker content into a writable buffer, starting at offset
+
+    The content may be a str or ASCII bytes.  As on the target, GAP
+    chunks skip over the buffer without writing to it, so content packed
+    with zeroed=True must be decoded into a cleared buffer.  Returns the
+    offset following the decoded content. """
+
+    if isinstance(content, str):
+        content = content.encode("ascii")
+    sextets = bytes(content).translate(_SEXTET_TABLE)
+    view = memoryview(buffer).cast("B")
+    origin = offset
+    position = 0
+    while position + HEADER_LENGTH <= len(sextets):
+        layout = _decode_header(sextets, position)
+        if layout is None:
+            break
+        encoding, length, payload_start, payload_end = layout
+        if encoding == Encoding.GAP:
+            decoded = None
+            end = offset + length
         else:
-            if encoding == Encoding.HEADER:
-                encoding, cycle_length, is_run_encoding = encoding_properties[
-                    Encoding(holding_sextet & LOW_TRIAD_MASK)
-                ]
-                remaining_bytes = ((holding_sextet & HIGH_TRIAD_MASK) << 3) + sextet
-                holding_sextet = 0
-                cycle_count = -1
-                if encoding == Encoding.GAP:
-                    result.extend([0] * remaining_bytes)
-                    encoding, cycle_length, is_run_encoding = encoding_properties[Encoding.HEADER]
-            else:
-                if is_run_encoding:   # SEXTET_RUN or OCTET_RUN
-                    result.extend([(holding_sextet << 6) + sextet] * remaining_bytes)
-                    remaining_bytes = 1
-                elif encoding == Encoding.TRIAD_STREAM:
-                    result.append(sextet & LOW_TRIAD_MASK)
-                    if remaining_bytes > 1:
-                        result.append((sextet & HIGH_TRIAD_MASK) >> 3)
-                        remaining_bytes -= 1
-                else:   # SEXTET_STREAM or LINEAR64
-                    result.append(((holding_sextet & LOW_DYAD_MASK) << 6) + sextet)
-                    holding_sextet = holding_sextet >> 2
-                remaining_bytes -= 1
-                if not remaining_bytes:
-                    encoding, cycle_length, is_run_encoding = encoding_properties[Encoding.HEADER]
-                    cycle_count = -1
-        cycle_count = (cycle_count + 1) % cycle_length
-    return bytes(result)
+            # Only a COPY chunk needs the content decoded before it
+            history_start = max(origin, offset - MAX_COPY_DISTANCE)
+            history = view[history_start:offset] if encoding == Encoding.COPY else b""
+            result = bytearray(history)
+            _decode_payload(result, encoding, length, sextets[payload_start:payload_end])
+            decoded = result[len(history):]
+            end = offset + len(decoded)
+        if end > len(view):
+            raise ValueError("Decoded content overruns the buffer at offset {}".format(offset))
+        if decoded is not None:
+            view[offset:end] = decoded
+        offset = end
+        position = payload_end
+    return offset
 
 def distill(content):
     """ Strip out comments and whitespace from VariPacker content """
     return asciiencoding.distill(content)
 
-def encode(content):
-    """ Encode binary content in VariPacker format (ASCII) """
+def encode(content, strategy="greedy", backend=None, cache=None, back_references=False,
+           palettes=False, huffman_coding=False, zeroed=False):
+    """ Encode binary content in VariPacker format (ASCII)
 
-    encoded_chunks = {}
-    source_buffer = [byte for byte in content]
-    source_buffer.append(None)   # Tail sentinel
-    all_triads = content and max(content) <= LOW_TRIAD_MASK
+    The strategy selects how the content is divided into chunks:
+    - "greedy" (default) makes a fixed sequence of passes, claiming
+      runs and streams that meet hard-coded minimum lengths
+    - "optimal" finds the sequence of chunks with the shortest possible
+      encoded length (counting headers, cycle padding and the
+      MAX_CHUNK_LENGTH limit), in time linear to the content length
 
-    for encoding in (
-            Encoding.SEXTET_RUN, Encoding.OCTET_RUN, Encoding.TRIAD_STREAM,
-            Encoding.SEXTET_STREAM, Encoding.LINEAR64
-        ):
-
-        value_limit, min_viable_length, is_run_encoding = {
-            Encoding.LINEAR64: (0xff, 1, False),
-            Encoding.OCTET_RUN: (0xff, 13 if all_triads else 7, True),
-            Encoding.SEXTET_RUN: (0x3f, 11 if all_triads else 6, True),
-            Encoding.SEXTET_STREAM: (0x3f, 14, False),
-            Encoding.TRIAD_STREAM: (0x07, 1 if all_triads else 6, False)
-        }[encoding]
-
-        source_chunk = []
-        start_index = 0
-        chunk_finished = False
-
-        for index, byte in enumerate(source_buffer):
-            if byte is None or byte > value_limit:
-                chunk_finished = True
-            elif is_run_encoding and source_chunk and byte != source_chunk[-1]:
-                # If this is different from the last byte then the run is done
-                chunk_finished = True
-            else:
-                source_chunk.append(byte)
-                chunk_finished = len(source_chunk) >= MAX_CHUNK_LENGTH
-            if chunk_finished:
-                chunk_length = len(source_chunk)
-                if chunk_length >= min_viable_length:
-                    source_chunk = b"".join([bytes([byte]) for byte in source_chunk])
-                    encoded_chunks[start_index] = encode_chunk(source_chunk, encoding)
-                    # Fill region of the chunk in the buffer with Nones, so it
-                    # doesn't get encoded on the next pass
-                    source_buffer[start_index:start_index + chunk_length] = [None] * chunk_length
-                start_index = index + 1
-                source_chunk = []
-                chunk_finished = False
-    result = "".join([chunk for (_, chunk) in sorted(encoded_chunks.items())])
-    return result
+    The backend ("python" or "numpy") selects how the greedy planner
+    scans the content; by default NumPy is used when it is installed.
+    Both backends give identical output.
+
+    If back_references, COPY chunks are used for sequences that repeat
+    earlier content (up to MAX_COPY_DISTANCE bytes back), as found by a
+    hash-chain match finder.  This is off by default, as decoders written
+    before COPY chunks were introduced do not support them.
+
+    If palettes, streams of few distinct values (e.g. map cells above 7)
+    may be encoded as a palette of those values, then a triad or sextet
+    index into it per byte, wherever that is shorter.  This too is off by
+    default, as older decoders do not support the extended encodings.
+
+    If huffman_coding, spans with skewed byte frequencies (e.g. text) may
+    be encoded as HUFFMAN chunks: a table of canonical code lengths, then
+    the bytes coded with those lengths, wherever the table pays for
+    itself.  This is also off by default, for the same reason.
+
+    If zeroed, the destination is assumed to be cleared before decoding,
+    so runs of zeros are encoded as GAP chunks (a header alone), which a
+    decoder skips over rather than writing (see decode_into()).
+
+    If a cache (e.g. a packcache.PackCache) is given, output stored
+    there for the same content and options is returned without
+    encoding, and newly encoded output is stored there. """
+
+    return encode_bytes(
+        content, strategy, backend, cache, back_references, palettes, huffman_coding, zeroed
+    ).decode("ascii")
 
-def encode_chunk(content, encoding):
-    """ Encodes a byte sequence using specified encoding  """
-    result = {
-        Encoding.LINEAR64: _encode_linear64,
-        Encoding.OCTET_RUN: _encode_octet_run,
-        Encoding.SEXTET_RUN: _encode_sextet_run,
-        Encoding.SEXTET_STREAM: _encode_sextet_stream,
-        Encoding.TRIAD_STREAM: _encode_triad_stream
-    }[encoding](content)
-    return _encode_header(encoding, len(content)) + result
+def encode_bytes(content, strategy="greedy", backend=None, cache=None, back_references=False,
+                 palettes=False, huffman_coding=False, zeroed=False):
+    """ Encode binary content in VariPacker format, as ASCII bytes
+
+    As encode(), but returns bytes, e.g. to be written to a binary file,
+    so that no text encoding is needed. """
+
+    content = memoryview(content).cast("B")
+    if cache is not None:
+        # Options are only part of the key when enabled, so that keys of
+        # entries stored before an option was introduced remain valid
+        options = {
+            name: True
+            for name, enabled in (
+                ("back_references", back_references),
+                ("palettes", palettes),
+                ("huffman_coding", huffman_coding),
+                ("zeroed", zeroed)
+            )
+            if enabled
+        }
+        key = cache.key(content, strategy=strategy, **options)
+        result = cache.get(key)
+        if result is None:
+            result = encode_bytes(content, strategy, backend, **options)
+            cache.put(key, result)
+        return result
+    chunks = _get_planner(
+        strategy, backend, back_references, palettes, huffman_coding, zeroed
+    )(content)
+    sextets = bytearray(sum([
+        _chunk_length(content[start:start + length], encoding)
+        for start, length, encoding, _ in chunks
+    ]))
+    position = 0
+    for start, length, encoding, distance in chunks:
+        position = _write_chunk(
+            sextets, position, content[start:start + length], encoding, distance
+        )
+    return bytes(sextets.translate(_CHARACTER_TABLE))
+
+def encode_chunk(content, encoding, distance=None):
+    """ Encodes a byte sequence using specified encoding
+
+    A COPY chunk also needs the distance back to the earlier occurrence
+    of the content (which is not itself encoded) """
+    content = memoryview(content).cast("B")
+    sextets = bytearray(_chunk_length(content, encoding))
+    _write_chunk(sextets, 0, content, encoding, distance)
+    return sextets.translate(_CHARACTER_TABLE).decode("ascii")
 
 def encode_gap(length):
     """ Encodes instruction for decoder to skip forward length bytes """
-    return _encode_header(Encoding.GAP, length)
-
-def _encode_linear64(content):
-    result = []
-    for content_index, byte in enumerate(content):
-        group_position = content_index % LINEAR64_GROUP_LENGTH
-        if not group_position:
-            high_bits_index = len(result)
-            result.append(0)
-        high_bits_shift = 2 * (LINEAR64_GROUP_LENGTH - group_position)
-        result[high_bits_index] += (byte & HIGH_BITS_MASK) >> high_bits_shift
-        result.append(byte & SEXTET_MASK)
-    return "".join([chr(byte + OFFSET) for byte in result])
-
-def _encode_header(encoding, length):
-    #print ("# Encoding={};Length={}".format(encoding.name, length))
-    result = (
-        chr(encoding.value + length // RADIX * 8 + OFFSET) +
-        chr((length & SEXTET_MASK) + OFFSET)
+    sextets = bytearray(HEADER_LENGTH)
+    _write_header(sextets, 0, Encoding.GAP, length)
+    return sextets.translate(_CHARACTER_TABLE).decode("ascii")
+
+def iter_decode(infile, block_size=READ_BLOCK_SIZE):
+    """ Decode binary data from a file of VariPacker content, a block at a time
+
+    The file may be opened in text or binary mode.  Yields the decoded
+    bytes as chunks are completed """
+    decoder = StreamDecoder()
+    content = infile.read(block_size)
+    while content:
+        result = decoder.feed(content)
+        if result:
+            yield result
+        content = infile.read(block_size)
+    result = decoder.finish()
+    if result:
+        yield result
+
+def iter_encode(source, window=DEFAULT_ENCODE_WINDOW, strategy="greedy", backend=None,
+                back_references=False, palettes=False, huffman_coding=False, zeroed=False):
+    """ Encode binary content in VariPacker format, a chunk at a time
+
+    The source may be a binary file object or an iterable of byte blocks.
+    At most window bytes are planned at once: chunks ending within
+    MAX_CHUNK_LENGTH of the end of the window are held back (as later
+    content could change them) and re-planned along with the following
+    content, and all others are yielded as encoded text.  Whenever the
+    window is at least as large as the content, the result is the same
+    as that of encode().  With back_references, COPY chunks only refer
+    back to content within the current window. """
+
+    if window < 2 * MAX_CHUNK_LENGTH:
+        raise ValueError("Window must be at least {} bytes".format(2 * MAX_CHUNK_LENGTH))
+    if hasattr(source, "read"):
+        source = iter(functools.partial(source.read, READ_BLOCK_SIZE), b"")
+    planner = _get_planner(
+        strategy, backend, back_references, palettes, huffman_coding, zeroed
     )
-    return result
+    buffer = bytearray()
+    for block in source:
+        buffer += block
+        while len(buffer) > window:
+            planned_content = bytes(buffer[:window])
+            emitted_length = 0
+            for start, length, encoding, distance in planner(planned_content):
+                if emitted_length and start + length > window - MAX_CHUNK_LENGTH:
+                    break
+                yield encode_chunk(planned_content[start:start + length], encoding, distance)
+                emitted_length = start + length
+            del buffer[:emitted_length]
+    content = bytes(buffer)
+    for start, length, encoding, distance in planner(content):
+        yield encode_chunk(content[start:start + length], encoding, distance)
 
-def _encode_octet_run(content):
-    if content:
-        result = (
-            chr(content[0] // RADIX + OFFSET) +
-            chr((content[0] & SEXTET_MASK) + OFFSET)
-        )
+def _get_planner(strategy, backend, back_references=False, palettes=False,
+                 huffman_coding=False, zeroed=False):
+    options = {
+        "back_references": back_references,
+        "palettes": palettes,
+        "huffman_coding": huffman_coding,
+        "zeroed": zeroed
+    }
+    if strategy == "greedy":
+        planner = functools.partial(_plan_greedy, backend=backend, **options)
+    elif strategy == "optimal":
+        planner = functools.partial(_plan_optimal, **options)
     else:
-        result = ""
-    return result
+        raise ValueError("Unrecognized encoding strategy \"{}\"".format(strategy))
+    return planner
 
-def _encode_sextet_run(content):
-    if content:
-        result = chr(content[0] + OFFSET)
+def _plan_greedy(content, backend=None, back_references=False, palettes=False,
+                 huffman_coding=False, zeroed=False):
+    """ Plans chunks using a fixed sequence of passes, one per encoding
+
+    If zeroed, a first pass claims GAP chunks for runs of zeros.
+    With back_references, a pass claiming COPY chunks for repeated
+    sequences is made between the run passes and the stream passes.
+    With palettes or huffman_coding, groups of adjacent run and stream
+    chunks are then replaced by palette or HUFFMAN chunks, where shorter
+    (see _merge_groups).
+
+    Returns a list of (start, length, encoding, distance) tuples, ordered
+    by start, where distance is None except for COPY chunks """
+
+    all_triads = content and max(content) <= LOW_TRIAD_MASK
+    run_passes = [
+        # (encoding, value limit, minimum viable length, is run encoding)
+        (Encoding.SEXTET_RUN, 0x3f, 11 if all_triads else 6, True),
+        (Encoding.OCTET_RUN, 0xff, 13 if all_triads else 7, True)
+    ]
+    if zeroed:
+        # A gap only pays where it saves more than the header of the
+        # stream chunk that follows it
+        run_passes.insert(0, (Encoding.GAP, 0x00, 9 if all_triads else 5, True))
+    stream_passes = [
+        (Encoding.TRIAD_STREAM, 0x07, 1 if all_triads else 6, False),
+        (Encoding.SEXTET_STREAM, 0x3f, 14, False),
+        (Encoding.LINEAR64, 0xff, 1, False)
+    ]
+    if not back_references:
+        chunks = segmenter.find_chunks(
+            content, run_passes + stream_passes, MAX_CHUNK_LENGTH, backend
+        )
+        chunks = [(start, length, encoding, None) for start, length, encoding in chunks]
     else:
-        result = ""
+        run_chunks = segmenter.find_chunks(content, run_passes, MAX_CHUNK_LENGTH, backend)
+        copy_chunks = _find_copies(content, run_chunks, 13 if all_triads else 7)
+        claims = [(start, length) for start, length, *_ in run_chunks + copy_chunks]
+        stream_chunks = segmenter.find_chunks(
+            content, stream_passes, MAX_CHUNK_LENGTH, backend, claims
+        )
+        chunks = sorted(
+            [(start, length, encoding, None) for start, length, encoding in run_chunks]
+            + copy_chunks
+            + [(start, length, encoding, None) for start, length, encoding in stream_chunks]
+        )
+    encodings = []
+    if palettes:
+        encodings.extend([Encoding.PALETTE_TRIAD_STREAM, Encoding.PALETTE_SEXTET_STREAM])
+    if huffman_coding:
+        encodings.append(Encoding.HUFFMAN)
+    if encodings:
+        chunks = _merge_groups(content, chunks, encodings)
+    return chunks
+
+def _merge_groups(content, chunks, encodings):
+    """ Replaces groups of adjacent chunks by single chunks, where shorter
+
+    Chunks are grouped while they are adjacent runs or streams that fit
+    in MAX_CHUNK_LENGTH together, and a group is replaced by one chunk of
+    the same bytes, in whichever of the (extended) encodings is shortest,
+    if that is shorter than the group. """
+    merged = []
+    group = []
+    # The final (empty) chunk flushes the last group
+    for chunk in chunks + [(len(content), 0, None, None)]:
+        start, length, encoding, _ = chunk
+        if (group and start == group[-1][0] + group[-1][1] and encoding in _GROUPED_ENCODINGS
+                and start + length - group[0][0] <= MAX_CHUNK_LENGTH):
+            group.append(chunk)
+            continue
+        if group:
+            group_start = group[0][0]
+            group_end = group[-1][0] + group[-1][1]
+            merged.extend(_shortest_group(
+                content[group_start:group_end], group_start, group, encodings
+            ))
+            group = []
+        if encoding in _GROUPED_ENCODINGS:
+            group.append(chunk)
+        elif length:
+            merged.append(chunk)
+    return merged
+
+def _shortest_group(content, start, group, encodings):
+    """ The chunks of a group, or one chunk for its content if shorter """
+    palette_size = len(set(content))
+    best_length = sum([
+        _chunk_length(content[chunk_start - start:chunk_start - start + length], encoding)
+        for chunk_start, length, encoding, _ in group
+    ])
+    best_chunks = group
+    for encoding in encodings:
+        if palette_size <= _MAX_PALETTE_SIZES.get(encoding, palette_size):
+            length = _chunk_length(content, encoding, palette_size)
+            if length < best_length:
+                best_length = length
+                best_chunks = [(start, len(content), encoding, None)]
+    return best_chunks
+
+def _find_copies(content, claimed_chunks, min_viable_length):
+    """ Claims COPY chunks for repeated sequences between claimed chunks
+
+    Scans the unclaimed content from the start, taking the longest match
+    found at each position if it is at least min_viable_length bytes.
+    Claimed content is still indexed, as a copy may refer back to any of
+    the content.  Returns a list of (start, length, Encoding.COPY,
+    distance) tuples. """
+
+    finder = matchfinder.MatchFinder(content, MAX_COPY_DISTANCE, MAX_CHUNK_LENGTH)
+    copies = []
+    position = 0
+    for claim_start, claim_length, _ in sorted(claimed_chunks) + [(len(content), 0, None)]:
+        while position < claim_start:
+            length, distance = finder.find(position, claim_start)
+            if length >= min_viable_length:
+                copies.append((position, length, Encoding.COPY, distance))
+                finder.insert_range(position, position + length)
+                position += length
+            else:
+                finder.insert(position)
+                position += 1
+        finder.insert_range(position, claim_start + claim_length)
+        position = claim_start + claim_length
+    return copies
+
+def _plan_optimal(content, back_references=False, palettes=False, huffman_coding=False,
+                  zeroed=False):
+    """ Plans the shortest possible sequence of chunks
+
+    Dynamic programming over content positions: best_cost[i] is the
+    fewest characters that can encode content[:i].  A chunk ending at i
+    may start at any j within MAX_CHUNK_LENGTH of i for which
+    content[j:i] is encodable, so the minimum over those j is kept in
+    sliding-window (monotonic deque) minima, giving linear running time.
+
+    Stream encodings cost HEADER_LENGTH + ceil(numerator * n / denominator)
+    characters for n bytes, so for each residue class of j (modulo the
+    denominator) the window is keyed on
+    denominator * best_cost[j] - numerator * j, which makes the cost of
+    every candidate in the class differ from its key by the same amount.
+
+    If zeroed, GAP chunks are considered for runs of zeros, as a run
+    encoding with no payload.
+
+    With back_references, COPY chunks are also considered, using the
+    longest match found by a match finder at each position.  As a COPY
+    chunk costs the same whatever its length, the earliest start whose
+    match reaches index is the best one, and the starts that could be
+    earliest for some later index are kept in a deque ordered by both
+    start and reach.
+
+    With palettes, palette chunks ending at index are also considered,
+    from the earliest start that keeps the palette within each of a few
+    sizes (PALETTE_SIZE_LIMITS).  Byte values are kept in order of their
+    last occurrence, so each such start is just past the last occurrence
+    of the value that would exceed the size.  Only those starts are
+    tried, so the plan is no longer guaranteed to be the shortest.
+
+    As the length of a HUFFMAN chunk depends on the frequencies of all of
+    its bytes, HUFFMAN chunks are not planned this way: with
+    huffman_coding, groups of adjacent run and stream chunks of the plan
+    are replaced by HUFFMAN chunks afterwards, where shorter (see
+    _merge_groups).
+
+    Returns a list of (start, length, encoding, distance) tuples, ordered
+    by start, where distance is None except for COPY chunks """
+
+    length = len(content)
+    best_cost = [0] * (length + 1)
+    best_chunk = [None] * (length + 1)
+    if back_references:
+        finder = matchfinder.MatchFinder(content, MAX_COPY_DISTANCE, MAX_CHUNK_LENGTH)
+        matches = []
+        for position in range(length):
+            matches.append(finder.find(position))
+            finder.insert(position)
+        # (start, reach, distance) of COPY chunk candidates
+        copy_window = deque()
+    if palettes:
+        # Byte values seen, latest last occurrence first
+        recent_values = []
+        last_positions = [0] * 256
+
+    run_windows = [
+        # (encoding, value limit, payload cost, window)
+        (Encoding.SEXTET_RUN, 0x3f, 1, deque()),
+        (Encoding.OCTET_RUN, 0xff, 2, deque())
+    ]
+    if zeroed:
+        run_windows.append((Encoding.GAP, 0x00, 0, deque()))
+    stream_windows = [
+        # (encoding, value limit, numerator, denominator, window per residue)
+        (Encoding.TRIAD_STREAM, 0x07, 1, 2, (deque(), deque())),
+        (Encoding.SEXTET_STREAM, 0x3f, 1, 1, (deque(),)),
+        (Encoding.LINEAR64, 0xff, 4, 3, (deque(), deque(), deque()))
+    ]
+
+    for index in range(1, length + 1):
+        start = index - 1
+        byte = content[start]
+        is_run_continued = start and content[start - 1] == byte
+        oldest_start = index - MAX_CHUNK_LENGTH
+        candidates = []
+
+        for encoding, value_limit, payload_cost, window in run_windows:
+            if byte > value_limit or not is_run_continued:
+                window.clear()
+            if byte <= value_limit:
+                _push_window(window, best_cost[start], start)
+                while window[0][1] < oldest_start:
+                    window.popleft()
+                candidates.append((window[0][0] + HEADER_LENGTH + payload_cost,
+                                   window[0][1], encoding))
+
+        for encoding, value_limit, numerator, denominator, windows in stream_windows:
+            if byte > value_limit:
+                for window in windows:
+                    window.clear()
+                continue
+            _push_window(
+                windows[start % denominator],
+                denominator * best_cost[start] - numerator * start,
+                start
+            )
+            for window in windows:
+                while window and window[0][1] < oldest_start:
+                    window.popleft()
+                if window:
+                    key, chunk_start = window[0]
+                    padding = (numerator * (chunk_start - index)) % denominator
+                    cost = (key + numerator * index + padding) // denominator
+                    candidates.append((cost + HEADER_LENGTH, chunk_start, encoding))
+
+        distance = None
+        if back_references:
+            copy_start = index - matchfinder.MIN_MATCH_LENGTH
+            if copy_start >= 0 and matches[copy_start][0]:
+                match_length, match_distance = matches[copy_start]
+                reach = copy_start + match_length
+                if not copy_window or reach > copy_window[-1][1]:
+                    copy_window.append((copy_start, reach, match_distance))
+            while copy_window and copy_window[0][1] < index:
+                copy_window.popleft()
+            if copy_window:
+                copy_start, _, distance = copy_window[0]
+                candidates.append((best_cost[copy_start] + HEADER_LENGTH + COPY_PAYLOAD_LENGTH,
+                                   copy_start, Encoding.COPY))
+
+        if palettes:
+            if byte in recent_values:
+                recent_values.remove(byte)
+            recent_values.insert(0, byte)
+            del recent_values[MAX_SEXTET_PALETTE_SIZE + 1:]
+            last_positions[byte] = start
+            candidates.extend(_palette_candidates(
+                best_cost, index, max(oldest_start, 0), recent_values, last_positions
+            ))
+
+        cost, chunk_start, encoding = min(candidates, key=lambda candidate: candidate[0])
+        best_cost[index] = cost
+        best_chunk[index] = (chunk_start, encoding, distance if encoding == Encoding.COPY else None)
+
+    chunks = []
+    index = length
+    while index:
+        chunk_start, encoding, distance = best_chunk[index]
+        chunks.append((chunk_start, index - chunk_start, encoding, distance))
+        index = chunk_start
+    chunks.reverse()
+    if huffman_coding:
+        chunks = _merge_groups(content, chunks, [Encoding.HUFFMAN])
+    return chunks
+
+def _palette_candidates(best_cost, index, oldest_start, recent_values, last_positions):
+    """ Lists (cost, start, encoding) of palette chunks ending at index
+
+    One chunk is listed for each of PALETTE_SIZE_LIMITS, starting as early
+    as possible (but no earlier than oldest_start) while needing a palette
+    of no more than that size. """
+    candidates = []
+    for size_limit in PALETTE_SIZE_LIMITS:
+        if size_limit < len(recent_values):
+            chunk_start = last_positions[recent_values[size_limit]] + 1
+        else:
+            chunk_start = 0
+        palette_size = min(size_limit, len(recent_values))
+        if chunk_start <= oldest_start:
+            chunk_start = oldest_start
+            palette_size = sum([
+                1 for value in recent_values[:palette_size]
+                if last_positions[value] >= chunk_start
+            ])
+        if palette_size <= MAX_TRIAD_PALETTE_SIZE:
+            encoding = Encoding.PALETTE_TRIAD_STREAM
+        else:
+            encoding = Encoding.PALETTE_SEXTET_STREAM
+        cost = best_cost[chunk_start] + EXTENDED_HEADER_LENGTH + _payload_length(
+            encoding, index - chunk_start, palette_size
+        )
+        candidates.append((cost, chunk_start, encoding))
+        if chunk_start == oldest_start:
+            break   # Larger palettes could not start any earlier
+    return candidates
+
+def _push_window(window, key, position):
+    """ Adds a candidate to a monotonic (sliding window minimum) deque """
+    while window and window[-1][0] >= key:
+        window.pop()
+    window.append((key, position))
+
+def _decode_chunks(result, sextets, is_final=True):
+    """ Decodes the chunks in a sequence of sextets, appending to result
+
+    Returns the position of the first sextet that was not decoded.
+    Unless is_final, a chunk left incomplete at the end of the sextets is
+    not decoded, so that it can be completed by subsequent content. """
+    position = 0
+    while position + HEADER_LENGTH <= len(sextets):
+        layout = _decode_header(sextets, position)
+        if layout is None:
+            # The header is cut short, before its payload can be located
+            if not is_final:
+                break
+            position = len(sextets)
+            break
+        encoding, length, payload_start, payload_end = layout
+        if payload_end > len(sextets) and not is_final:
+            break
+        _decode_payload(result, encoding, length, sextets[payload_start:payload_end])
+        position = payload_end
+    return position
+
+def _decoded_length(sextets):
+    """ Number of bytes the chunks in a sequence of sextets decode to """
+    result = 0
+    position = 0
+    while position + HEADER_LENGTH <= len(sextets):
+        layout = _decode_header(sextets, position)
+        if layout is None:
+            break
+        _, length, _, position = layout
+        result += length
     return result
 
-def _encode_sextet_stream(content):
-    return "".join([chr(byte + OFFSET) for byte in content])
+def _decode_header(sextets, position):
+    """ Decodes the header of the chunk at a position
 
-def _encode_triad_stream(content):
-    result = []
-    for index in range(0, len(content), 2):
-        byte = content[index]
+    Returns (encoding, length, payload start, payload end), or None if
+    the sextets end before the extent of the payload is known. """
+    high_sextet = sextets[position]
+    try:
+        encoding = Encoding(high_sextet & LOW_TRIAD_MASK)
+    except ValueError:
+        encoding = None
+    payload_start = position + HEADER_LENGTH
+    if encoding == Encoding.HEADER:
+        if payload_start >= len(sextets):
+            return None
         try:
-            byte += content[index + 1] << 3
-        except IndexError:
-            pass
-        result.append(chr(byte + OFFSET))
-    return "".join(result)
+            encoding = Encoding(EXTENDED_BASE + sextets[payload_start])
+        except ValueError:
+            encoding = None
+        payload_start += 1
+    if encoding is None:
+        raise ValueError("Unrecognized chunk encoding at position {}".format(position))
+    length = ((high_sextet & HIGH_TRIAD_MASK) << 3) + sextets[position + 1]
+    if encoding == Encoding.HUFFMAN and length:
+        payload_end = extendedchunks.huffman_payload_end(sextets, payload_start)
+        return None if payload_end is None else (encoding, length, payload_start, payload_end)
+    palette_size = 0
+    if encoding in _MAX_PALETTE_SIZES and length:
+        if payload_start >= len(sextets):
+            return None
+        palette_size = sextets[payload_start] + 1
+    return (encoding, length, payload_start,
+            payload_start + _payload_length(encoding, length, palette_size))
+
+def _chunk_length(content, encoding, palette_size=None):
+    """ Number of characters in a chunk encoding content
+
+    For a palette encoding, the palette size is counted from the content
+    unless it is given. """
+    if encoding.value < EXTENDED_BASE:
+        return HEADER_LENGTH + _payload_length(encoding, len(content))
+    if encoding == Encoding.HUFFMAN:
+        return EXTENDED_HEADER_LENGTH + extendedchunks.huffman_payload_length(content)
+    if palette_size is None:
+        palette_size = len(set(content))
+    return EXTENDED_HEADER_LENGTH + _payload_length(encoding, len(content), palette_size)
+
+def _payload_length(encoding, length, palette_size=0):
+    """ Number of characters in the payload of a chunk
+
+    Palette chunks also depend on the palette_size """
+    if encoding in _MAX_PALETTE_SIZES:
+        if not length:
+            result = 0
+        elif encoding == Encoding.PALETTE_TRIAD_STREAM:
+            result = extendedchunks.palette_length(palette_size) + (length + 1) // 2
+        else:
+            result = extendedchunks.palette_length(palette_size) + length
+    elif encoding == Encoding.GAP:
+        result = 0
+    elif encoding == Encoding.OCTET_RUN:
+        result = 2 if length else 0
+    elif encoding == Encoding.COPY:
+        result = COPY_PAYLOAD_LENGTH if length else 0
+    elif encoding == Encoding.SEXTET_RUN:
+        result = 1 if length else 0
+    elif encoding == Encoding.TRIAD_STREAM:
+        result = (length + 1) // 2
+    elif encoding == Encoding.SEXTET_STREAM:
+        result = length
+    else:   # LINEAR64
+        result = length + (length + LINEAR64_GROUP_LENGTH - 1) // LINEAR64_GROUP_LENGTH
+    return result
+
+def _decode_payload(result, encoding, length, payload):
+    """ Appends the bytes represented by a chunk payload (as sextets) to result """
+    if encoding == Encoding.GAP:
+        result.extend(bytes(length))
+    elif encoding == Encoding.SEXTET_RUN:
+        if payload:
+            result.extend(payload[0:1] * length)
+    elif encoding == Encoding.OCTET_RUN:
+        if len(payload) == 2:
+            result.extend(bytes([(payload[0] << 6) + payload[1]]) * length)
+    elif encoding == Encoding.COPY:
+        if len(payload) == COPY_PAYLOAD_LENGTH:
+            distance = (payload[0] << 6) + payload[1]
+            if not 0 < distance <= len(result):
+                raise ValueError(
+                    "COPY chunk distance {} is outside the decoded content".format(distance)
+                )
+            # A copy longer than its distance repeats the copied bytes
+            copied = result[len(result) - distance:len(result) - distance + length]
+            result.extend((copied * (length // distance + 1))[:length])
+    elif encoding == Encoding.SEXTET_STREAM:
+        result.extend(payload)
+    elif encoding == Encoding.TRIAD_STREAM:
+        result.extend(_unpack_triads(payload)[:length])
+    elif encoding in _MAX_PALETTE_SIZES:
+        if payload:
+            palette, indexes_start = extendedchunks.read_palette(payload)
+            if encoding == Encoding.PALETTE_TRIAD_STREAM:
+                indexes = _unpack_triads(payload[indexes_start:])[:length]
+            else:
+                indexes = payload[indexes_start:]
+            result.extend(extendedchunks.look_up_palette(palette, indexes))
+    elif encoding == Encoding.HUFFMAN:
+        result.extend(extendedchunks.decode_huffman_payload(payload, length))
+    else:   # LINEAR64
+        group_count = (len(payload) + 3) // 4
+        available = len(payload) - group_count
+        payload = payload.ljust(4 * group_count, b"\x00")
+        high_bits = payload[0::4]
+        octets = bytearray(LINEAR64_GROUP_LENGTH * group_count)
+        for group_position in range(LINEAR64_GROUP_LENGTH):
+            octets[group_position::LINEAR64_GROUP_LENGTH] = _merge_bits(
+                payload[group_position + 1::4],
+                high_bits.translate(_HIGH_BITS_TABLES[group_position])
+            )
+        result.extend(octets[:min(length, available)])
+
+def _unpack_triads(payload):
+    """ Splits each sextet into its low then its high triad """
+    triads = bytearray(2 * len(payload))
+    triads[0::2] = payload.translate(_LOW_TRIAD_TABLE)
+    triads[1::2] = payload.translate(_HIGH_TRIAD_TABLE)
+    return triads
+
+def _merge_bits(content1, content2):
+    """ Bitwise OR of two equal length byte sequences """
+    return (
+        int.from_bytes(content1, "big") | int.from_bytes(content2, "big")
+    ).to_bytes(len(content1), "big")
+
+def _write_chunk(sextets, position, content, encoding, distance=None):
+    """ Writes the header and payload of a chunk into a buffer of sextets
+
+    For a COPY chunk, distance is how far back the content occurred
+    before.  Returns the position following the chunk """
+    length = len(content)
+    position = _write_header(sextets, position, encoding, length)
+    if encoding in _MAX_PALETTE_SIZES:
+        return _write_palette_payload(sextets, position, content, encoding)
+    if encoding == Encoding.HUFFMAN:
+        return extendedchunks.write_huffman_payload(sextets, position, content)
+    payload_length = _payload_length(encoding, length)
+    if not length or encoding == Encoding.GAP:
+        pass
+    elif encoding == Encoding.SEXTET_RUN:
+        sextets[position] = content[0]
+    elif encoding == Encoding.OCTET_RUN:
+        sextets[position] = content[0] >> 6
+        sextets[position + 1] = content[0] & SEXTET_MASK
+    elif encoding == Encoding.COPY:
+        if distance is None or not 0 < distance <= MAX_COPY_DISTANCE:
+            raise ValueError("A COPY chunk needs a distance from 1 to {}".format(
+                MAX_COPY_DISTANCE))
+        sextets[position] = distance >> 6
+        sextets[position + 1] = distance & SEXTET_MASK
+    elif encoding == Encoding.SEXTET_STREAM:
+        sextets[position:position + length] = content
+    elif encoding == Encoding.TRIAD_STREAM:
+        _write_triads(sextets, position, content)
+    elif encoding == Encoding.LINEAR64:
+        _write_linear64(sextets, position, content)
+    else:
+        raise ValueError("Unable to encode a chunk using {}".format(encoding))
+    return position + payload_length
+
+def _write_header(sextets, position, encoding, length):
+    """ Writes a chunk header, returning the position following it """
+    if encoding.value < EXTENDED_BASE:
+        sextets[position] = encoding.value + length // RADIX * 8
+        header_length = HEADER_LENGTH
+    else:
+        sextets[position] = Encoding.HEADER.value + length // RADIX * 8
+        sextets[position + HEADER_LENGTH] = encoding.value - EXTENDED_BASE
+        header_length = EXTENDED_HEADER_LENGTH
+    sextets[position + 1] = length & SEXTET_MASK
+    return position + header_length
+
+def _write_triads(sextets, position, content):
+    """ Writes pairs of values of up to 3 bits as sextets, low triad first """
+    payload_length = (len(content) + 1) // 2
+    sextets[position:position + payload_length] = _merge_bits(
+        bytes(content[0::2]),
+        bytes(content[1::2]).translate(_TRIAD_SHIFT_TABLE).ljust(payload_length, b"\x00")
+    )
+
+def _write_palette_payload(sextets, position, content, encoding):
+    """ Writes the palette of the distinct values in content, then indexes into it
+
+    Returns the position following the payload """
+    if not len(content):
+        return position
+    indexes, position = extendedchunks.write_palette(
+        sextets, position, content, _MAX_PALETTE_SIZES[encoding]
+    )
+    if encoding == Encoding.PALETTE_TRIAD_STREAM:
+        _write_triads(sextets, position, indexes)
+        return position + (len(indexes) + 1) // 2
+    sextets[position:position + len(indexes)] = indexes
+    return position + len(indexes)
+
+def _write_linear64(sextets, position, content):
+    """ Writes groups of 3 bytes as 4 sextets: high bits first, then low bits """
+    group_count, tail_length = divmod(len(content), LINEAR64_GROUP_LENGTH)
+    grouped_length = LINEAR64_GROUP_LENGTH * group_count
+    groups_end = position + 4 * group_count
+    high_bits = bytes(group_count)
+    for group_position in range(LINEAR64_GROUP_LENGTH):
+        octets = bytes(content[group_position:grouped_length:LINEAR64_GROUP_LENGTH])
+        high_bits = _merge_bits(
+            high_bits, octets.translate(_HIGH_BITS_SHIFT_TABLES[group_position])
+        )
+        sextets[position + group_position + 1:groups_end:4] = octets.translate(_LOW_SEXTET_TABLE)
+    sextets[position:groups_end:4] = high_bits
+    if tail_length:
+        tail = content[grouped_length:]
+        sextets[groups_end] = sum([
+            (byte & HIGH_BITS_MASK) >> (2 * (LINEAR64_GROUP_LENGTH - group_position))
+            for group_position, byte in enumerate(tail)
+        ])
+        sextets[groups_end + 1:groups_end + 1 + tail_length] = tail.tobytes().translate(
+            _LOW_SEXTET_TABLE
+        )
@@ -1,5 +1,6 @@
 """ Unit Tests for asciiencoding module """
 
+import io
 from itsybitser import asciiencoding
 
 def test_distill_remove_whitespace():
@@ -41,3 +42,42 @@ def test_compare_whitespaced_different():
         "vBIybIF&WBFE&WOF*f\n4((*N44w r9[-]{}", "vBIy bIF&W\rBFE&WOF*f4((*N44wr9[]{}"
     )
     assert result == 29
+
+def test_distill_unicode_whitespace():
+    """ Removal of non-ASCII whitespace, as str.split() would """
+    result = asciiencoding.distill("AB C D\x1cE # é\né")
+    assert result == "ABCDEé"
+
+def test_compare_prefix():
+    """ Compare where one string is a prefix of the other """
+    assert asciiencoding.compare("ABC D", "AB # C") == 2
+    assert asciiencoding.compare("AB", "A B\nC") == 2
+
+def test_compare_distilled():
+    """ Compare strings that are already distilled """
+    content = "0123456789" * 1000
+    assert asciiencoding.compare_distilled(content, content) == -1
+    assert asciiencoding.compare_distilled(content, content[:9876] + "X") == 9876
+    assert asciiencoding.compare_distilled(content, content[:5000]) == 5000
+
+def test_locate_difference_same():
+    """ Locate difference between equivalent strings """
+    assert asciiencoding.locate_difference("AB # x\nCD", "A B\n\tC D # y") is None
+
+def test_locate_difference():
+    """ Locate difference in distilled and original coordinates """
+    result = asciiencoding.locate_difference("AB # x\nCD", "A B\n\tC E # y")
+    assert result == (3, 8, 7)
+
+def test_locate_difference_ended():
+    """ Locate difference where one string ends early """
+    result = asciiencoding.locate_difference("AB  # x\n", "ABC")
+    assert result == (2, 8, 2)
+
+def test_locate_difference_files():
+    """ Locate difference between file objects, across read blocks """
+    content = "# header\n" + "0123456789ABCDEF\n" * 10000
+    changed = content[:100000] + "X" + content[100001:]
+    result = asciiencoding.locate_difference(io.StringIO(content), io.StringIO(changed))
+    expected_index = len(asciiencoding.distill(content[:100000]))
+    assert result == (expected_index, 100000, 100000)
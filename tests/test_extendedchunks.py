@@ -0,0 +1,34 @@
+""" Unit test cases for extendedchunks module """
+
+import pytest
+from itsybitser import extendedchunks
+
+def test_palette_round_trip():
+    content = b"\x90\x10\x90\xff\x10"
+    sextets = bytearray(16)
+    indexes, position = extendedchunks.write_palette(sextets, 0, content, 8)
+    assert (indexes, position) == (b"\x01\x00\x01\x02\x00", 7)
+    assert sextets[:position] == bytes([2, 0, 16, 2, 16, 3, 63])
+    palette, indexes_start = extendedchunks.read_palette(sextets)
+    assert (palette, indexes_start) == (b"\x10\x90\xff", position)
+    assert extendedchunks.look_up_palette(palette, indexes) == content
+
+def test_palette_errors():
+    with pytest.raises(ValueError):
+        extendedchunks.write_palette(bytearray(32), 0, bytes(range(9)), 8)
+    with pytest.raises(ValueError):
+        extendedchunks.look_up_palette(b"\x10\x90", b"\x00\x02")
+
+def test_huffman_payload_round_trip():
+    content = b"AAAABBC" * 20
+    length = extendedchunks.huffman_payload_length(content)
+    sextets = bytearray(length)
+    assert extendedchunks.write_huffman_payload(sextets, 0, content) == length
+    assert extendedchunks.huffman_payload_end(sextets, 0) == length
+    assert extendedchunks.huffman_payload_end(sextets[:3], 0) is None
+    assert extendedchunks.decode_huffman_payload(bytes(sextets), len(content)) == content
+
+def test_huffman_payload_empty():
+    assert extendedchunks.huffman_payload_length(b"") == 0
+    assert extendedchunks.write_huffman_payload(bytearray(), 0, b"") == 0
+    assert extendedchunks.decode_huffman_payload(b"\x00\x05", 5) == b""
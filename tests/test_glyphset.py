@@ -0,0 +1,171 @@
+""" Unit test cases for glyphset module """
+
+import io
+import pytest
+
+png = pytest.importorskip("png")
+
+from itsybitser import glyphset  # pylint: disable=wrong-import-position
+
+WHITE = [255, 255, 255]
+BLACK = [0, 0, 0]
+DIM = [30, 20, 10]
+
+
+def _atlas(pixel_rows):
+    """ PNG content for rows of "#" (white), "+" (dim) and "." (black) pixels """
+    rows = [
+        sum([WHITE if pixel == "#" else (DIM if pixel == "+" else BLACK) for pixel in row], [])
+        for row in pixel_rows
+    ]
+    output = io.BytesIO()
+    png.Writer(len(pixel_rows[0]), len(pixel_rows), greyscale=False).write(output, rows)
+    return io.BytesIO(output.getvalue())
+
+_PIXEL_ROWS = [
+    "#.......++++++++#",
+    ".#......#.......#",
+    "..#.....#.......#",
+    "...#....#########",
+    "....#...#.......#",
+    ".....#..#.......#",
+    "......#.#.......#",
+    ".......##.......#",
+    "################.",
+]
+
+def test_glyph_bytes():
+    glyphs = glyphset.GlyphSet(_atlas(_PIXEL_ROWS))
+    assert (glyphs.rows, glyphs.columns) == (1, 2)
+    assert glyphs.glyph_bytes(0) == bytes([0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01])
+    assert glyphs.glyph_bytes(1) == bytes([0x00, 0x80, 0x80, 0xff, 0x80, 0x80, 0x80, 0x80])
+
+def test_glyph_bytes_without_numpy(monkeypatch):
+    expected = glyphset.GlyphSet(_atlas(_PIXEL_ROWS))
+    monkeypatch.setattr(glyphset, "numpy", None)
+    glyphs = glyphset.GlyphSet(_atlas(_PIXEL_ROWS))
+    assert [glyphs.glyph_bytes(index) for index in range(2)] == [
+        expected.glyph_bytes(index) for index in range(2)
+    ]
+
+def test_render_glyph():
+    result = glyphset.GlyphSet(_atlas(_PIXEL_ROWS)).render_glyph(1)
+    assert result.split("\n")[:4] == [
+        "###### Glyph 1 ######",
+        "00 # " + " " * 16,
+        "80 # []" + " " * 14,
+        "80 # []" + " " * 14
+    ]
+
+def test_load_requested_glyphs():
+    glyphs = glyphset.GlyphSet(_atlas(_PIXEL_ROWS * 3), glyph_indexes=[3])
+    assert glyphs.rows == 3
+    assert glyphs.glyph_bytes(3) == glyphset.GlyphSet(_atlas(_PIXEL_ROWS * 3)).glyph_bytes(3)
+    assert glyphs.render_glyphs() == glyphs.render_glyph(3)
+    with pytest.raises(ValueError):
+        glyphs.glyph_bytes(0)
+
+def test_glyph_positions_outside_atlas():
+    glyphs = glyphset.GlyphSet(_atlas(_PIXEL_ROWS))
+    with pytest.raises(ValueError):
+        glyphs.glyph_bytes(2)
+    with pytest.raises(ValueError):
+        glyphs.glyph_bytes(-1)
+    with pytest.raises(ValueError):
+        glyphset.GlyphSet(_atlas(_PIXEL_ROWS), glyph_indexes=[1, 3])
+
+_DUPLICATE_PIXEL_ROWS = [
+    "#.......#.......#..............#.......#........",
+    "##......##......##............##.......#........",
+    "###.....###.....###..........###.......#........",
+    "####....####....####........####.......#........",
+    "...............................................#",
+    "...............................................#",
+    "...............................................#",
+    "...............................................#",
+]
+
+def test_find_unique_glyphs():
+    glyphs = glyphset.GlyphSet(_atlas(_DUPLICATE_PIXEL_ROWS))
+    assert glyphs.find_unique_glyphs() == (
+        [0, 3, 4, 5],
+        [(0, 0), (0, 0), (0, 0), (1, 0), (2, 0), (3, 0)]
+    )
+
+def test_find_unique_glyphs_mirror_flip():
+    glyphs = glyphset.GlyphSet(_atlas(_DUPLICATE_PIXEL_ROWS))
+    assert glyphs.find_unique_glyphs(mirror=True) == (
+        [0, 4, 5],
+        [(0, 0), (0, 0), (0, 0), (0, glyphset.MIRRORED), (1, 0), (2, 0)]
+    )
+    assert glyphs.find_unique_glyphs([0, 3, 4, 5], mirror=True, flip=True) == (
+        [0, 4],
+        [(0, 0), (0, glyphset.MIRRORED), (1, 0), (1, glyphset.FLIPPED)]
+    )
+
+def test_render_remap_table():
+    result = glyphset.render_remap_table([7, 9], [(0, 0), (0, glyphset.MIRRORED)], True)
+    assert result == (
+        "#### Remap table ####\n"
+        "00 00 # Glyph 7: distinct glyph 0\n"
+        "00 01 # Glyph 9: distinct glyph 0, mirrored\n"
+    )
+    result = glyphset.render_remap_table([300], [(300, 0)])
+    assert result == "#### Remap table ####\n2C 01 # Glyph 300: distinct glyph 300\n"
+
+_MULTICOLOR_PALETTE = [(0, 0, 0), (255, 255, 255), (30, 20, 10)]
+
+def test_glyph_geometry():
+    glyphs = glyphset.GlyphSet(_atlas(_PIXEL_ROWS), glyph_width=16, glyph_height=4)
+    assert (glyphs.rows, glyphs.columns, glyphs.row_length) == (2, 1, 2)
+    assert glyphs.glyph_bytes(0) == bytes([0x80, 0x00, 0x40, 0x80, 0x20, 0x80, 0x10, 0xff])
+    glyphs = glyphset.GlyphSet(_atlas(_PIXEL_ROWS), glyph_width=3, glyph_height=2)
+    assert (glyphs.rows, glyphs.columns, glyphs.row_length) == (4, 5, 1)
+    assert glyphs.glyph_bytes(0) == bytes([0x80, 0x40])
+
+def test_glyph_bits_per_pixel():
+    glyphs = glyphset.GlyphSet(
+        _atlas(_PIXEL_ROWS), bits_per_pixel=2, palette=_MULTICOLOR_PALETTE
+    )
+    assert glyphs.row_length == 2
+    assert glyphs.glyph_values(1)[:2] == [[2] * 8, [1] + [0] * 7]
+    assert glyphs.glyph_bytes(1)[:4] == bytes([0xaa, 0xaa, 0x40, 0x00])
+    assert glyphs.render_glyph(1).split("\n")[1:3] == [
+        "AA AA # " + "22" * 8,
+        "40 00 # 11" + " " * 14
+    ]
+
+def test_glyph_grey_palette():
+    glyphs = glyphset.GlyphSet(_atlas(_PIXEL_ROWS), bits_per_pixel=2)
+    assert glyphs.palette == [(0, 0, 0), (85, 85, 85), (170, 170, 170), (255, 255, 255)]
+    assert glyphs.glyph_values(1)[:2] == [[0] * 8, [3] + [0] * 7]
+
+@pytest.mark.parametrize("options", [
+    {"glyph_width": 16, "glyph_height": 3},
+    {"glyph_width": 3, "glyph_height": 4, "bits_per_pixel": 3, "palette": _MULTICOLOR_PALETTE},
+    {"bits_per_pixel": 8, "palette": _MULTICOLOR_PALETTE}
+])
+def test_glyph_geometry_without_numpy(monkeypatch, options):
+    expected = glyphset.GlyphSet(_atlas(_PIXEL_ROWS), **options)
+    monkeypatch.setattr(glyphset, "numpy", None)
+    glyphs = glyphset.GlyphSet(_atlas(_PIXEL_ROWS), **options)
+    assert glyphs.render_glyphs() == expected.render_glyphs()
+
+def test_find_unique_glyphs_geometry():
+    glyphs = glyphset.GlyphSet(
+        _atlas(_DUPLICATE_PIXEL_ROWS), glyph_width=4, glyph_height=4, bits_per_pixel=2,
+        palette=_MULTICOLOR_PALETTE
+    )
+    unique_indexes, remap = glyphs.find_unique_glyphs([0, 1, 2, 3], mirror=True)
+    assert unique_indexes == [0, 1]
+    assert remap == [(0, 0), (1, 0), (0, 0), (1, 0)]
+    unique_indexes, remap = glyphs.find_unique_glyphs([0, 7], mirror=True)
+    assert (unique_indexes, remap) == ([0], [(0, 0), (0, glyphset.MIRRORED)])
+
+def test_glyph_geometry_errors():
+    with pytest.raises(ValueError):
+        glyphset.GlyphSet(_atlas(_PIXEL_ROWS), glyph_width=0)
+    with pytest.raises(ValueError):
+        glyphset.GlyphSet(_atlas(_PIXEL_ROWS), bits_per_pixel=9)
+    with pytest.raises(ValueError):
+        glyphset.GlyphSet(_atlas(_PIXEL_ROWS), palette=_MULTICOLOR_PALETTE)
@@ -1,5 +1,7 @@
 """ Unit Tests for class Hextream """
 
+import io
+import pytest
 from itsybitser import hextream
 
 def test_encode_empty():
@@ -71,3 +73,25 @@ def test_compare_different():
         "AB\\x019AA9 FF BB$CC0xDD"
     )
     assert result == 11
+
+def test_iter_decode_across_blocks():
+    """ decode with comments, prefixes and digit pairs split across blocks """
+    content = "AB $01 0\nx9A \\xA9F\nF # a comment\nbbcc#inline\n\tdD"
+    for block_size in range(1, len(content) + 1):
+        result = b"".join(hextream.iter_decode(io.StringIO(content), block_size))
+        assert result == b"\xab\x01\x9a\xa9\xff\xbb\xcc\xdd"
+
+def test_iter_decode_odd_digits():
+    """ decode content with an unpaired digit """
+    with pytest.raises(ValueError):
+        list(hextream.iter_decode(io.StringIO("AB C"), 2))
+
+def test_stream_encoder():
+    """ encode in pieces, with the same layout as encode """
+    content = bytes(range(0, 40))
+    outfile = io.StringIO()
+    encoder = hextream.StreamEncoder(outfile)
+    for index in range(0, len(content), 7):
+        encoder.write(content[index:index + 7])
+    encoder.finish()
+    assert outfile.getvalue() == hextream.encode(content)
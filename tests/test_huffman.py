@@ -0,0 +1,46 @@
+""" Unit test cases for huffman module """
+
+import collections
+import pytest
+from itsybitser import huffman
+
+def test_code_lengths_skewed():
+    lengths = huffman.code_lengths({0x41: 8, 0x42: 4, 0x43: 2, 0x44: 2})
+    assert lengths == {0x41: 1, 0x42: 2, 0x43: 3, 0x44: 3}
+
+def test_code_lengths_single_symbol():
+    assert huffman.code_lengths({0x41: 5}) == {0x41: 1}
+
+def test_code_lengths_limited():
+    frequencies = {symbol: 2 ** symbol for symbol in range(20)}
+    lengths = huffman.code_lengths(frequencies, max_length=8)
+    assert max(lengths.values()) <= 8
+    assert sum([2 ** -length for length in lengths.values()]) <= 1
+
+def test_code_lengths_too_many_symbols():
+    with pytest.raises(ValueError):
+        huffman.code_lengths({symbol: 1 for symbol in range(5)}, max_length=2)
+
+def test_canonical_codes():
+    codes = huffman.canonical_codes({0x44: 3, 0x41: 1, 0x43: 3, 0x42: 2})
+    assert codes == {0x41: "0", 0x42: "10", 0x43: "110", 0x44: "111"}
+
+def test_encode():
+    lengths = {0x41: 1, 0x42: 2, 0x43: 3, 0x44: 3}
+    assert huffman.encode(b"ABCDA", lengths) == bytes([0b010110, 0b111000])
+
+def test_round_trip():
+    content = b"SCORE: 000100\x9bHIGH SCORE: 009000\x9bLEVEL 1\x9b" * 5
+    frequencies = collections.Counter(content)
+    lengths = huffman.code_lengths(frequencies)
+    sextets = huffman.encode(content, lengths)
+    assert len(sextets) == huffman.sextet_count(frequencies, lengths)
+    assert huffman.decode(sextets, lengths, len(content)) == content
+
+def test_decode_truncated():
+    lengths = {0x41: 1, 0x42: 2, 0x43: 3, 0x44: 3}
+    assert huffman.decode(bytes([0b010110]), lengths, 5) == b"ABC"
+
+def test_decode_invalid_lengths():
+    with pytest.raises(ValueError):
+        huffman.decode(bytes(1), {0x41: 1, 0x42: 1, 0x43: 1}, 1)
@@ -0,0 +1,48 @@
+""" Unit test cases for imagediff module """
+
+import pytest
+from itsybitser import imagediff
+
+def _backends():
+    return [
+        backend for backend in imagediff.BACKENDS
+        if backend != "numpy" or imagediff.numpy is not None
+    ]
+
+def test_changed_ranges_same():
+    for backend in _backends():
+        assert imagediff.changed_ranges(b"\x01\x02\x03", b"\x01\x02\x03", backend) == []
+        assert imagediff.changed_ranges(b"", b"", backend) == []
+
+def test_changed_ranges():
+    base = bytes(range(100)) * 100
+    target = bytearray(base)
+    target[0] ^= 1
+    target[4095:4098] = b"\xff\xff\xff"
+    target[9999] ^= 1
+    for backend in _backends():
+        result = imagediff.changed_ranges(base, target, backend)
+        assert result == [(0, 1), (4095, 4098), (9999, 10000)]
+
+def test_changed_ranges_lengths_differ():
+    for backend in _backends():
+        assert imagediff.changed_ranges(b"\x01\x02", b"\x01\x03\x04\x05", backend) == [(1, 4)]
+        assert imagediff.changed_ranges(b"\x01\x02", b"\x01\x02\x04", backend) == [(2, 3)]
+        assert imagediff.changed_ranges(b"\x01\x02\x03", b"\x00\x02", backend) == [(0, 1)]
+
+def test_changed_ranges_backends_agree():
+    if imagediff.numpy is None:
+        pytest.skip("NumPy is not installed")
+    base = bytes([(index * 7919) % 251 for index in range(20000)])
+    target = bytes([
+        value ^ (index % 97 < 3 or 5000 <= index < 9000 and index % 5 != 0)
+        for index, value in enumerate(base)
+    ])
+    assert (
+        imagediff.changed_ranges(base, target, "numpy") ==
+        imagediff.changed_ranges(base, target, "python")
+    )
+
+def test_changed_ranges_unknown_backend():
+    with pytest.raises(ValueError):
+        imagediff.changed_ranges(b"\x00", b"\x01", "bogus")
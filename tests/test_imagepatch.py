@@ -0,0 +1,35 @@
+""" Unit test cases for imagepatch module """
+
+import pytest
+from itsybitser import imagepatch
+
+def test_encode():
+    base = bytes(range(200)) * 5
+    target = bytearray(base)
+    target[600:603] = b"\x41\x41\x41"
+    result = imagepatch.encode(base, target)
+    assert result == "ho" + "8I" + "73E111"
+    assert imagepatch.apply(result, base) == target
+
+def test_encode_merges_close_changes():
+    base = bytes(100)
+    target = bytearray(base)
+    target[10] = target[14] = 1
+    assert imagepatch.encode(base, target) == "0:" + "35101"
+
+def test_encode_unchanged():
+    assert imagepatch.encode(b"\x01\x02\x03", b"\x01\x02\x03") == ""
+
+def test_apply_longer_target():
+    base = bytes(range(0, 256)) * 8
+    target = base[:1000] + b"\x02\x03" + base[1002:] + b"\x05" * 20
+    for strategy in ("greedy", "optimal"):
+        result = imagepatch.encode(base, target, strategy=strategy, back_references=True)
+        assert imagepatch.apply(result, base) == target
+
+def test_encode_shorter_target():
+    base = bytes(range(256)) * 4
+    with pytest.raises(ValueError):
+        imagepatch.encode(base, base[:-100])
+    with pytest.raises(ValueError):
+        imagepatch.encode(base, b"")
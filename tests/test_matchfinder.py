@@ -0,0 +1,36 @@
+""" Unit test cases for matchfinder module """
+
+from itsybitser import matchfinder
+
+def _finder(content, max_distance=4095, max_length=511):
+    return matchfinder.MatchFinder(content, max_distance, max_length)
+
+def test_find_no_match():
+    finder = _finder(b"abcdefgh")
+    finder.insert_range(0, 4)
+    assert finder.find(4) == (0, 0)
+
+def test_find_longest_match():
+    content = b"abcdxabcdeyabcdez"
+    finder = _finder(content)
+    finder.insert_range(0, 11)
+    assert finder.find(11) == (5, 6)
+
+def test_find_overlapping():
+    finder = _finder(b"ab" * 10)
+    finder.insert_range(0, 2)
+    assert finder.find(2) == (18, 2)
+
+def test_find_limits():
+    content = b"abcdef" * 4
+    finder = _finder(content, max_distance=6, max_length=8)
+    finder.insert_range(0, 6)
+    assert finder.find(6) == (8, 6)
+    assert finder.find(6, limit=10) == (4, 6)
+    assert finder.find(6, limit=8) == (0, 0)
+
+def test_find_beyond_max_distance():
+    content = b"abc" + b"x" * 10 + b"abc"
+    finder = _finder(content, max_distance=12)
+    finder.insert_range(0, 13)
+    assert finder.find(13) == (0, 0)
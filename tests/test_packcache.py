@@ -0,0 +1,60 @@
+""" Unit test cases for packcache module """
+
+import os
+from itsybitser import packcache, varipacker
+
+def test_encode_miss_then_hit(tmp_path):
+    cache = packcache.PackCache(str(tmp_path))
+    content = bytes(range(256)) * 4
+    first = varipacker.encode(content, cache=cache)
+    second = varipacker.encode(content, cache=cache)
+    assert first == second == varipacker.encode(content)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_cached_output_is_returned(tmp_path):
+    cache = packcache.PackCache(str(tmp_path))
+    content = b"\x01\x02\x03"
+    cache.put(cache.key(content, strategy="greedy"), b"stored")
+    assert varipacker.encode(content, cache=cache) == "stored"
+    assert varipacker.encode(content, strategy="optimal", cache=cache) != "stored"
+
+def test_key_depends_on_content_options_and_version(tmp_path, monkeypatch):
+    cache = packcache.PackCache(str(tmp_path))
+    key = cache.key(b"abc", strategy="greedy")
+    assert cache.key(b"abc", strategy="greedy") == key
+    assert cache.key(b"abd", strategy="greedy") != key
+    assert cache.key(b"abc", strategy="optimal") != key
+    monkeypatch.setattr(varipacker, "ENCODER_VERSION", varipacker.ENCODER_VERSION + 1)
+    assert cache.key(b"abc", strategy="greedy") != key
+
+def test_get_missing(tmp_path):
+    cache = packcache.PackCache(str(tmp_path / "absent"))
+    assert cache.get("0" * 64) is None
+    assert cache.misses == 1
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = packcache.PackCache(str(tmp_path), max_size=25)
+    for order, key in enumerate(["c", "b", "a"]):
+        cache.put(key, b"x" * 10)
+        path = os.path.join(str(tmp_path), key + packcache.ENTRY_EXTENSION)
+        os.utime(path, (1000 + order, 1000 + order))
+    assert cache.get("c") is None
+    assert cache.get("b") == b"x" * 10
+    assert cache.get("a") == b"x" * 10
+
+def test_get_refreshes_entry(tmp_path):
+    cache = packcache.PackCache(str(tmp_path), max_size=25)
+    for key in ["a", "b"]:
+        cache.put(key, b"x" * 10)
+        os.utime(os.path.join(str(tmp_path), key + packcache.ENTRY_EXTENSION), (1000, 1000))
+    cache.get("a")
+    cache.put("c", b"x" * 10)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+def test_clear(tmp_path):
+    cache = packcache.PackCache(str(tmp_path))
+    cache.put("a", b"packed")
+    cache.clear()
+    assert cache.get("a") is None
+    assert os.listdir(str(tmp_path)) == []
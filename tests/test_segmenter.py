@@ -0,0 +1,79 @@
+""" Unit test cases for segmenter module """
+
+import pytest
+from itsybitser import segmenter
+
+PASSES = [
+    ("run", 0xff, 3, True),
+    ("stream", 0x07, 2, False),
+    ("rest", 0xff, 1, False)
+]
+
+def _backends():
+    return [
+        backend for backend in segmenter.BACKENDS
+        if backend != "numpy" or segmenter.numpy is not None
+    ]
+
+def test_find_chunks_empty():
+    for backend in _backends():
+        assert segmenter.find_chunks(b"", PASSES, 8, backend) == []
+
+def test_find_chunks_runs_and_streams():
+    content = b"\x41\x41\x41\x41\x01\x02\x03\xff\x05"
+    for backend in _backends():
+        result = segmenter.find_chunks(content, PASSES, 8, backend)
+        assert result == [(0, 4, "run"), (4, 3, "stream"), (7, 2, "rest")]
+
+def test_find_chunks_split_maximal():
+    content = b"\x41" * 19
+    for backend in _backends():
+        result = segmenter.find_chunks(content, PASSES, 8, backend)
+        assert result == [(0, 8, "run"), (8, 8, "run"), (16, 3, "run")]
+
+def test_find_chunks_adjacent_runs():
+    # First byte of a run directly following an incomplete run is left
+    # for later passes (as in the original planner scan)
+    content = b"\x41" * 4 + b"\x42" * 4 + b"\x43" * 8 + b"\x44" * 4
+    for backend in _backends():
+        result = segmenter.find_chunks(content, PASSES, 8, backend)
+        assert result == [
+            (0, 4, "run"), (4, 1, "rest"), (5, 3, "run"), (8, 1, "rest"),
+            (9, 7, "run"), (16, 1, "rest"), (17, 3, "run")
+        ]
+
+def test_find_chunks_backends_agree():
+    if segmenter.numpy is None:
+        pytest.skip("NumPy is not installed")
+    content = bytes([(index * 7919) % 13 // 3 for index in range(5000)])
+    content += b"\x09" * 1000 + bytes(range(256)) * 4
+    assert (
+        segmenter.find_chunks(content, PASSES, 511, "numpy") ==
+        segmenter.find_chunks(content, PASSES, 511, "python")
+    )
+
+def test_find_chunks_unknown_backend():
+    with pytest.raises(ValueError):
+        segmenter.find_chunks(b"\x00", PASSES, 8, "bogus")
+
+def test_find_chunks_claims():
+    content = b"\x41" * 6 + b"\x01\x02\x03\x04\x05\x06"
+    for backend in _backends():
+        result = segmenter.find_chunks(content, PASSES, 8, backend, claims=[(2, 2), (7, 3)])
+        assert result == [(0, 2, "rest"), (4, 3, "rest"), (10, 2, "stream")]
+
+def test_find_chunks_single_byte_runs():
+    # Single-byte runs between longer runs invert whether the next
+    # longer run loses its first byte, and are claimed if viable
+    content = b"\x41" * 5 + b"\x01\x02" + b"\x42" * 5 + b"\x03" + b"\x43" * 4
+    for backend in _backends():
+        result = segmenter.find_chunks(content, PASSES, 4, backend)
+        assert result == [
+            (0, 4, "run"), (4, 1, "rest"), (5, 2, "stream"), (7, 1, "rest"),
+            (8, 4, "run"), (12, 2, "rest"), (14, 3, "run")
+        ]
+        result = segmenter.find_chunks(content, [("run", 0xff, 1, True)], 4, backend)
+        assert result == [
+            (0, 4, "run"), (4, 1, "run"), (6, 1, "run"), (8, 4, "run"), (12, 1, "run"),
+            (14, 3, "run")
+        ]
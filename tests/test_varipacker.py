@@ -1,5 +1,7 @@
 """ Unit test cases for varipacker class """
 
+import io
+import pytest
 from itsybitser import varipacker
 
 def test_encode_sextet_stream():
@@ -319,3 +321,324 @@ def test_decode_gap_sextet_stream_octet_run_and_linear64():
     result = varipacker.decode(content)
     assert result == b"\x00\x00\x00\x00\x01\x3e\x3f\x3f\x3e\x01\x00" + b"\xfa" * 7 + b"\xff\x77\xaa\xfe"
 
+
+def _shortest_encoded_length(content):
+    """ Brute force reference for the optimal planner """
+    best = [0] + [None] * len(content)
+    for end in range(1, len(content) + 1):
+        for start in range(max(0, end - varipacker.MAX_CHUNK_LENGTH), end):
+            chunk = content[start:end]
+            costs = [varipacker.encode_chunk(chunk, varipacker.Encoding.LINEAR64)]
+            if max(chunk) <= 0x3f:
+                costs.append(varipacker.encode_chunk(chunk, varipacker.Encoding.SEXTET_STREAM))
+            if max(chunk) <= 0x07:
+                costs.append(varipacker.encode_chunk(chunk, varipacker.Encoding.TRIAD_STREAM))
+            if len(set(chunk)) == 1:
+                costs.append(varipacker.encode_chunk(chunk, varipacker.Encoding.OCTET_RUN))
+                if chunk[0] <= 0x3f:
+                    costs.append(varipacker.encode_chunk(chunk, varipacker.Encoding.SEXTET_RUN))
+            cost = best[start] + min([len(encoded) for encoded in costs])
+            if best[end] is None or cost < best[end]:
+                best[end] = cost
+    return best[-1]
+
+def test_encode_optimal_empty():
+    result = varipacker.encode(b"", strategy="optimal")
+    assert result == ""
+
+def test_encode_optimal_single_run():
+    content = b"\x39" * 511
+    result = varipacker.encode(content, strategy="optimal")
+    assert result == varipacker.encode_chunk(content, varipacker.Encoding.SEXTET_RUN)
+
+def test_encode_optimal_splits_maximal_chunks():
+    content = b"\xdd" * 1023
+    result = varipacker.encode(content, strategy="optimal")
+    assert len(result) == 3 * 4
+    assert varipacker.decode(result) == content
+
+def test_encode_optimal_shortest():
+    content = (
+        b"\x01\x02" * 20 + b"\x00" * 7 + b"\x11\x12\x13\x14\x15\x16" * 3 +
+        b"\x61\x62" + b"\x40" * 10 + b"\x03\x04\x05" + b"\x77" * 9 + bytes(range(0, 256, 9))
+    )
+    result = varipacker.encode(content, strategy="optimal")
+    assert varipacker.decode(result) == content
+    assert len(result) == _shortest_encoded_length(content)
+    assert len(result) <= len(varipacker.encode(content))
+
+def test_encode_optimal_never_longer_than_greedy():
+    for content in (
+            bytes(range(0, 100)),
+            b"\x00\x01\x06\x07\x07\x06\x01\x00" * 70,
+            b"\x3f\x3e" * 300 + b"\x40\x00\x00" * 200
+        ):
+        result = varipacker.encode(content, strategy="optimal")
+        assert varipacker.decode(result) == content
+        assert len(result) <= len(varipacker.encode(content))
+
+def test_encode_unknown_strategy():
+    with pytest.raises(ValueError):
+        varipacker.encode(b"\x00", strategy="bogus")
+
+def test_decode_multiple_linear64_groups():
+    content = bytes(range(0, 256)) * 3
+    result = varipacker.decode(varipacker.encode(content))
+    assert result == content
+
+def test_decode_mixed_chunks_round_trip():
+    content = (
+        b"\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e" + (b"\x39" * 600) +
+        b"\x61\x62\x01\x02\x03\x04\x05\x06" + (b"\x40" * 10) + b"\x77" + bytes(range(255, 0, -1))
+    )
+    for strategy in ("greedy", "optimal"):
+        result = varipacker.decode(varipacker.encode(content, strategy=strategy))
+        assert result == content
+
+def test_decode_truncated_linear64():
+    content = "74WogZ3"
+    result = varipacker.decode(content)
+    assert result == b"\xff\x77\xaa"
+
+def test_decode_unrecognized_encoding():
+    with pytest.raises(ValueError):
+        varipacker.decode("6300")
+
+def test_encode_bytes():
+    content = bytes(range(0, 256)) + (b"\x39" * 600) + b"\x01\x02\x03\x04\x05\x06" * 9
+    result = varipacker.encode_bytes(bytearray(content))
+    assert result == varipacker.encode(content).encode("ascii")
+
+def test_decode_bytes():
+    content = bytes(range(0, 256)) + (b"\x39" * 600) + b"\x01\x02\x03\x04\x05\x06" * 9
+    assert varipacker.decode_bytes(varipacker.encode_bytes(content)) == content
+    assert varipacker.decode_bytes(bytearray(b"74WogZ3")) == b"\xff\x77\xaa"
+
+def test_stream_decoder_piecewise():
+    content = bytes(range(0, 256)) + (b"\x39" * 600) + b"\x01\x02\x03\x04\x05\x06" * 9
+    encoded = varipacker.encode(content)
+    decoder = varipacker.StreamDecoder()
+    result = b"".join([
+        decoder.feed(encoded[index:index + 5]) for index in range(0, len(encoded), 5)
+    ])
+    result += decoder.finish()
+    assert result == content
+
+def test_stream_decoder_comments_whitespace():
+    decoder = varipacker.StreamDecoder()
+    result = decoder.feed("# comment 1\n4801n")
+    assert result == b""
+    result = decoder.feed("o # comment")
+    assert result == b""
+    result = decoder.feed(" 2 which # continues\non1\r\n0 17")
+    assert result == b"\x00\x01\x3e\x3f\x3f\x3e\x01\x00"
+    result = decoder.feed("3j")
+    assert result == b"\xfa" * 7
+    assert decoder.finish() == b""
+
+def test_stream_decoder_truncated():
+    decoder = varipacker.StreamDecoder()
+    assert decoder.feed("74WogZ3") == b""
+    assert decoder.finish() == b"\xff\x77\xaa"
+
+def test_iter_decode():
+    content = bytes(range(0, 200)) * 10
+    infile = io.StringIO("# packed\n" + varipacker.encode(content) + "\n")
+    result = list(varipacker.iter_decode(infile, block_size=64))
+    assert len(result) > 1
+    assert b"".join(result) == content
+
+def test_iter_decode_binary():
+    content = bytes(range(0, 200)) * 10
+    header = "# packed \u2014 binary\n".encode("utf-8")
+    infile = io.BytesIO(header + varipacker.encode_bytes(content))
+    result = b"".join(varipacker.iter_decode(infile, block_size=64))
+    assert result == content
+
+def test_stream_decoder_non_ascii():
+    decoder = varipacker.StreamDecoder()
+    with pytest.raises(ValueError):
+        decoder.feed("48\u00e9")
+
+def test_iter_encode_matches_encode():
+    content = (bytes(range(0, 256)) + (b"\x39" * 600) + b"\x01\x02\x03\x04\x05\x06" * 9) * 4
+    blocks = [content[index:index + 100] for index in range(0, len(content), 100)]
+    for strategy in ("greedy", "optimal"):
+        result = "".join(varipacker.iter_encode(blocks, window=len(content), strategy=strategy))
+        assert result == varipacker.encode(content, strategy=strategy)
+
+def test_iter_encode_small_window():
+    content = (bytes(range(0, 256)) + (b"\x39" * 600) + b"\x01\x02\x03\x04\x05\x06" * 9) * 4
+    chunks = list(varipacker.iter_encode(io.BytesIO(content), window=1022))
+    assert len(chunks) > 1
+    assert varipacker.decode("".join(chunks)) == content
+
+def test_iter_encode_window_too_small():
+    with pytest.raises(ValueError):
+        list(varipacker.iter_encode([b"\x00"], window=100))
+
+def test_encode_copy():
+    result = varipacker.encode_chunk(b"\x01\x02\x03\x01\x02", varipacker.Encoding.COPY, 3)
+    assert result == "6503"
+
+def test_encode_copy_maximal_distance():
+    result = varipacker.encode_chunk(b"\x00" * 64, varipacker.Encoding.COPY, 4095)
+    assert result == ">0oo"
+
+def test_encode_copy_invalid_distance():
+    for distance in (None, 0, 4096):
+        with pytest.raises(ValueError):
+            varipacker.encode_chunk(b"\x00" * 3, varipacker.Encoding.COPY, distance)
+
+def test_decode_copy_overlapping():
+    result = varipacker.decode("43123" + "6703" + "0")
+    assert result == b"\x01\x02\x03" * 3 + b"\x01"
+
+def test_decode_copy_invalid_distance():
+    with pytest.raises(ValueError):
+        varipacker.decode("43123" + "6304")
+
+def test_encode_back_references_round_trip():
+    content = (bytes(range(100, 180)) * 3 + b"\x05\x06" * 40 + bytes(range(200, 256))) * 6
+    for strategy in ("greedy", "optimal"):
+        plain = varipacker.encode(content, strategy=strategy)
+        result = varipacker.encode(content, strategy=strategy, back_references=True)
+        assert varipacker.decode(result) == content
+        assert len(result) < len(plain)
+
+def test_encode_back_references_optimal_never_longer():
+    content = bytes(range(0, 256)) * 2 + b"\x07\x01" * 30 + b"\x41\x42\x43" * 20
+    assert len(varipacker.encode(content, strategy="optimal", back_references=True)) <= len(
+        varipacker.encode(content, strategy="optimal"))
+
+def test_stream_decoder_copy_across_feeds():
+    content = bytes(range(90, 250)) * 4
+    encoded = varipacker.encode(content, back_references=True)
+    decoder = varipacker.StreamDecoder()
+    result = b"".join([
+        decoder.feed(encoded[index:index + 3]) for index in range(0, len(encoded), 3)
+    ])
+    result += decoder.finish()
+    assert result == content
+
+def test_encode_palette_triad_stream():
+    result = varipacker.encode_chunk(b"\x41\x42\x41\x80", varipacker.Encoding.PALETTE_TRIAD_STREAM)
+    assert result == "54021112208@"
+
+def test_encode_palette_sextet_stream():
+    result = varipacker.encode_chunk(b"\xff\x41\xff", varipacker.Encoding.PALETTE_SEXTET_STREAM)
+    assert result == "5311113o101"
+
+def test_encode_palette_too_many_values():
+    with pytest.raises(ValueError):
+        varipacker.encode_chunk(bytes(range(9)), varipacker.Encoding.PALETTE_TRIAD_STREAM)
+    with pytest.raises(ValueError):
+        varipacker.encode_chunk(bytes(range(65)), varipacker.Encoding.PALETTE_SEXTET_STREAM)
+
+def test_decode_palette_streams():
+    assert varipacker.decode("54021112208@") == b"\x41\x42\x41\x80"
+    assert varipacker.decode("5311113o101") == b"\xff\x41\xff"
+
+def test_decode_palette_index_out_of_range():
+    with pytest.raises(ValueError):
+        varipacker.decode("53111130" + "2")
+
+def test_decode_unrecognized_extended_encoding():
+    with pytest.raises(ValueError):
+        varipacker.decode("53o")
+
+def test_encode_palettes_round_trip():
+    tiles = b"\x41\x5a\x80\x81\x90\xc7"
+    content = bytes([tiles[(index * 7) % 11 % 6] for index in range(3000)])
+    for strategy in ("greedy", "optimal"):
+        plain = varipacker.encode(content, strategy=strategy)
+        result = varipacker.encode(content, strategy=strategy, palettes=True)
+        assert varipacker.decode(result) == content
+        assert len(result) < len(plain) * 2 // 3
+
+def test_encode_palettes_never_longer_greedy():
+    content = bytes(range(0, 256)) + (b"\x39" * 600) + b"\x01\x02\x03\x04\x05\x06" * 9
+    assert varipacker.encode(content, palettes=True) == varipacker.encode(content)
+
+def test_stream_decoder_palette_across_feeds():
+    content = b"\x80\x90" * 30 + b"\x41\x42\x43\xfe" * 50
+    encoded = varipacker.encode(content, strategy="optimal", palettes=True)
+    for piece_length in (1, 2, 3):
+        decoder = varipacker.StreamDecoder()
+        result = b"".join([
+            decoder.feed(encoded[index:index + piece_length])
+            for index in range(0, len(encoded), piece_length)
+        ])
+        result += decoder.finish()
+        assert result == content
+
+def test_encode_huffman():
+    result = varipacker.encode_chunk(b"aaab", varipacker.Encoding.HUFFMAN)
+    assert result == "54201011Q1R4"
+
+def test_decode_huffman():
+    assert varipacker.decode("54201011Q1R4") == b"aaab"
+
+def test_decode_huffman_truncated():
+    assert varipacker.decode("54201011Q1R") == b""
+    assert varipacker.decode("54201011Q1R4"[:5]) == b""
+
+def test_encode_huffman_coding_round_trip():
+    content = b"PRESS START\x9bGAME OVER\x9bTHE DOOR IS LOCKED\x9b" * 40
+    for strategy in ("greedy", "optimal"):
+        plain = varipacker.encode(content, strategy=strategy)
+        result = varipacker.encode(content, strategy=strategy, huffman_coding=True)
+        assert varipacker.decode(result) == content
+        assert len(result) < len(plain) * 2 // 3
+
+def test_encode_huffman_coding_only_when_shorter():
+    content = bytes(range(0, 256)) + (b"\x39" * 600) + b"\x01\x02\x03\x04\x05\x06" * 9
+    assert varipacker.encode(content, huffman_coding=True) == varipacker.encode(content)
+
+def test_stream_decoder_huffman_across_feeds():
+    content = b"LEVEL 1\x9bSCORE 0\x9b" * 30
+    encoded = varipacker.encode(content, huffman_coding=True)
+    decoder = varipacker.StreamDecoder()
+    result = b"".join([decoder.feed(character) for character in encoded])
+    result += decoder.finish()
+    assert result == content
+
+def test_encode_zeroed_gap():
+    content = b"\x41\x42\x43" + bytes(20) + b"\x44"
+    result = varipacker.encode(content, zeroed=True)
+    assert result == "73E123" + "0D" + "7114"
+    assert varipacker.decode(result) == content
+
+def test_encode_zeroed_short_zero_run():
+    content = b"\x41\x42\x43" + bytes(4) + b"\x44"
+    assert varipacker.encode(content, zeroed=True) == varipacker.encode(content)
+
+def test_encode_zeroed_shorter():
+    content = (b"\x05\x06\x07" + bytes(9) + b"\x41" * 3 + bytes(600)) * 5
+    for strategy in ("greedy", "optimal"):
+        result = varipacker.encode(content, strategy=strategy, zeroed=True)
+        assert varipacker.decode(result) == content
+        assert len(result) < len(varipacker.encode(content, strategy=strategy))
+
+def test_decode_into_skips_gaps():
+    buffer = bytearray(b"\xff" * 26)
+    result = varipacker.decode_into("73E123" + "0D" + "7114", buffer, 2)
+    assert result == 26
+    assert buffer == b"\xff\xff\x41\x42\x43" + b"\xff" * 20 + b"\x44"
+
+def test_decode_into():
+    content = bytes(range(10, 60)) * 3 + bytes(100) + b"\x41" * 40
+    encoded = varipacker.encode(content, zeroed=True, back_references=True)
+    buffer = bytearray(len(content) + 4)
+    assert varipacker.decode_into(encoded, buffer, 4) == len(buffer)
+    assert buffer[4:] == content
+
+def test_decode_into_overrun():
+    with pytest.raises(ValueError):
+        varipacker.decode_into(varipacker.encode(bytes(range(30))), bytearray(10))
+
+def test_decoded_length():
+    content = varipacker.encode(bytes(range(200)) * 3)
+    assert varipacker.decoded_length(content) == 600
+    assert varipacker.decoded_length(content.encode("ascii")) == 600
+    assert varipacker.decoded_length(varipacker.encode_gap(300) + varipacker.encode(b"\x05" * 3)) == 303